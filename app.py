@@ -1,19 +1,175 @@
 import os
 from dotenv import load_dotenv
 import requests
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timedelta
 from collections import defaultdict
-from textblob import TextBlob
 import time
 from functools import wraps
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import re
+import json
+import logging
+import random
+from contextlib import contextmanager
+import zlib
+import sqlite3
+import contextvars
+import multiprocessing
+from array import array
+import threading
+import hashlib
+import queue
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from flask.json.provider import DefaultJSONProvider
+import gzip
+
+# Optional accelerators: orjson for serialization, brotli for compression
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 load_dotenv()
 
+# Overridable so benchmarks can point the app at a local fixture server
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Fraction of per-call GitHub request logs that are emitted
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.05))
+logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger('gitrecap')
+
+class Metrics:
+    """Minimal thread-safe counters, gauges and histograms with Prometheus text output"""
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.help = {}
+        self.types = {}
+        self.values = defaultdict(float)
+        self.histograms = {}
+        self.callbacks = []
+
+    def describe(self, name, metric_type, help_text):
+        self.types[name] = metric_type
+        self.help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] += value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(self.DEFAULT_BUCKETS), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.DEFAULT_BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def on_collect(self, fn):
+        """Register a function that refreshes gauges right before each scrape"""
+        self.callbacks.append(fn)
+        return fn
+
+    def render(self):
+        for fn in self.callbacks:
+            try:
+                fn()
+            except Exception:
+                logger.exception("Metrics collector failed")
+
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{str(v)}"' for k, v in pairs) + '}'
+
+        lines = []
+        with self.lock:
+            names = sorted({name for name, _ in self.values} | {name for name, _ in self.histograms})
+            for name in names:
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} {self.types[name]}")
+                for (metric, labels), value in sorted(self.values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{fmt(labels)} {value}")
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(self.DEFAULT_BUCKETS, histogram['buckets']):
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {histogram['count']}")
+                    lines.append(f"{name}_sum{fmt(labels)} {histogram['sum']}")
+                    lines.append(f"{name}_count{fmt(labels)} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+metrics.describe('gitrecap_stage_seconds', 'histogram', 'Time spent in each analysis stage')
+metrics.describe('gitrecap_github_requests_total', 'counter', 'GitHub API responses by method and status code')
+metrics.describe('gitrecap_github_request_seconds', 'histogram', 'GitHub API request latency')
+metrics.describe('gitrecap_github_response_bytes_total', 'counter', 'Bytes received from the GitHub API')
+metrics.describe('gitrecap_github_errors_total', 'counter', 'GitHub calls that failed or were refused locally, by kind')
+metrics.describe('gitrecap_github_not_modified_total', 'counter', 'Conditional GitHub requests answered with 304')
+metrics.describe('gitrecap_sentiment_cache_lookups_total', 'counter', 'Sentiment score lookups by cache result')
+metrics.describe('gitrecap_github_rate_limit_remaining', 'gauge', 'Lowest remaining GitHub quota seen per API resource')
+metrics.describe('gitrecap_cache_hit_ratio', 'gauge', 'Hit ratio per cache')
+metrics.describe('gitrecap_cache_entries', 'gauge', 'Entries held per in-process cache')
+metrics.describe('gitrecap_jobs_total', 'counter', 'Finished background analysis jobs by source and status')
+metrics.describe('gitrecap_jobs', 'gauge', 'Background analysis jobs held in history by status')
+metrics.describe('gitrecap_circuit_open', 'gauge', '1 while the GitHub circuit breaker is open or half-open')
+
+# Concurrency limits for GitHub fetches: per /analyze request and per process
+MAX_REPO_WORKERS = int(os.getenv('MAX_REPO_WORKERS', 8))
+MAX_GITHUB_IN_FLIGHT = int(os.getenv('MAX_GITHUB_IN_FLIGHT', 16))
+github_slots = threading.BoundedSemaphore(MAX_GITHUB_IN_FLIGHT)
+
+# Fetch pages 2..last concurrently once the first page's Link header names the last page
+PARALLEL_PAGINATION = os.getenv('PARALLEL_PAGINATION', 'true').lower() in ('1', 'true', 'yes')
+MAX_PAGE_WORKERS = int(os.getenv('MAX_PAGE_WORKERS', 4))
+
+# Crawl caps shared by both fetch backends, in pages of 100: 500 repos and 300 commits per repo
+MAX_REPO_PAGES = 5
+MAX_COMMIT_PAGES = 3
+
+# Shared keep-alive session so GitHub calls reuse pooled TLS connections
+github_session = requests.Session()
+github_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_GITHUB_IN_FLIGHT))
+
+# Conditional-request cache: (url, token hash) -> validators and last 200 body (zlib-compressed)
+ETAG_CACHE_SIZE = int(os.getenv('ETAG_CACHE_SIZE', 2000))
+etag_cache = OrderedDict()
+etag_cache_lock = threading.Lock()
+
 # Removed global GitHub access token as per security requirements
 token = None
 
@@ -26,7 +182,26 @@ def get_headers(user_token=None):
         headers['Authorization'] = f'token {token_to_use}'
     return headers
 
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify through orjson when it is installed, keeping the default provider's sorted keys"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return dump_json_bytes(obj).decode()
+
+def dump_json_bytes(data):
+    """Compact JSON bytes with sorted keys.
+
+    The same document as jsonify's output, but not always the same bytes:
+    orjson writes non-ASCII text as raw UTF-8 where the stdlib escapes it.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=DefaultJSONProvider.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=DefaultJSONProvider.default, sort_keys=True, separators=(',', ':')).encode()
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 @app.route('/')
@@ -39,64 +214,64 @@ limiter = Limiter(
     default_limits=["200 per day", "50 per hour"]
 )
 
+TRENDING_USERS = [
+    {
+        'username': 'octocat',
+        'name': 'GitHub Octocat',
+        'description': 'GitHub mascot and demo account',
+        'avatar_url': 'https://github.com/octocat.png?size=100',
+        'followers': 10000,
+        'repos': 8
+    },
+    {
+        'username': 'torvalds',
+        'name': 'Linus Torvalds',
+        'description': 'Creator of Linux and Git',
+        'avatar_url': 'https://github.com/torvalds.png?size=100',
+        'followers': 150000,
+        'repos': 2
+    },
+    {
+        'username': 'antirez',
+        'name': 'Salvatore Sanfilippo',
+        'description': 'Creator of Redis',
+        'avatar_url': 'https://github.com/antirez.png?size=100',
+        'followers': 12000,
+        'repos': 15
+    },
+    {
+        'username': 'gvanrossum',
+        'name': 'Guido van Rossum',
+        'description': 'Creator of Python',
+        'avatar_url': 'https://github.com/gvanrossum.png?size=100',
+        'followers': 8000,
+        'repos': 5
+    },
+    {
+        'username': 'jashkenas',
+        'name': 'Jeremy Ashkenas',
+        'description': 'Creator of Backbone.js and CoffeeScript',
+        'avatar_url': 'https://github.com/jashkenas.png?size=100',
+        'followers': 20000,
+        'repos': 25
+    },
+    {
+        'username': 'defunkt',
+        'name': 'Chris Wanstrath',
+        'description': 'GitHub co-founder',
+        'avatar_url': 'https://github.com/defunkt.png?size=100',
+        'followers': 25000,
+        'repos': 30
+    }
+]
+
 @app.route('/trending', methods=['GET'])
 @limiter.limit("100 per hour")
 def get_trending_users():
     """Get trending GitHub users for discovery"""
-    trending_users = [
-        {
-            'username': 'octocat',
-            'name': 'GitHub Octocat',
-            'description': 'GitHub mascot and demo account',
-            'avatar_url': 'https://github.com/octocat.png?size=100',
-            'followers': 10000,
-            'repos': 8
-        },
-        {
-            'username': 'torvalds',
-            'name': 'Linus Torvalds',
-            'description': 'Creator of Linux and Git',
-            'avatar_url': 'https://github.com/torvalds.png?size=100',
-            'followers': 150000,
-            'repos': 2
-        },
-        {
-            'username': 'antirez',
-            'name': 'Salvatore Sanfilippo',
-            'description': 'Creator of Redis',
-            'avatar_url': 'https://github.com/antirez.png?size=100',
-            'followers': 12000,
-            'repos': 15
-        },
-        {
-            'username': 'gvanrossum',
-            'name': 'Guido van Rossum',
-            'description': 'Creator of Python',
-            'avatar_url': 'https://github.com/gvanrossum.png?size=100',
-            'followers': 8000,
-            'repos': 5
-        },
-        {
-            'username': 'jashkenas',
-            'name': 'Jeremy Ashkenas',
-            'description': 'Creator of Backbone.js and CoffeeScript',
-            'avatar_url': 'https://github.com/jashkenas.png?size=100',
-            'followers': 20000,
-            'repos': 25
-        },
-        {
-            'username': 'defunkt',
-            'name': 'Chris Wanstrath',
-            'description': 'GitHub co-founder',
-            'avatar_url': 'https://github.com/defunkt.png?size=100',
-            'followers': 25000,
-            'repos': 30
-        }
-    ]
-    
     return jsonify({
-        'trending_users': trending_users,
-        'total': len(trending_users)
+        'trending_users': TRENDING_USERS,
+        'total': len(TRENDING_USERS)
     })
 
 @app.route('/stats', methods=['GET'])
@@ -121,7 +296,11 @@ def get_api_stats():
             'Repository collaboration',
             'Developer personality types',
             'Productivity metrics'
-        ]
+        ],
+        'result_cache': result_cache.snapshot(),
+        'github_quota': quota_scheduler.snapshot(),
+        'github_health': github_breaker.snapshot(),
+        'jobs': job_queue.snapshot()
     })
 
 def sanitize_username(username):
@@ -133,67 +312,479 @@ def sanitize_username(username):
     return username
 
 def debug_request(response):
-    print(f"Request to {response.url}")
-    print(f"Status: {response.status_code}")
-    print(f"Rate limit: {response.headers.get('X-RateLimit-Remaining')}/{response.headers.get('X-RateLimit-Limit')}")
+    """Log a sample of GitHub responses; failures at warning, the rest at debug"""
+    if random.random() >= LOG_SAMPLE_RATE:
+        return
+    rate_limit = f"{response.headers.get('X-RateLimit-Remaining')}/{response.headers.get('X-RateLimit-Limit')}"
     if response.status_code != 200:
-        print(f"Error response: {response.text[:200]}")
+        logger.warning(f"GitHub {response.status_code} for {response.url} (rate limit {rate_limit}): {response.text[:200]}")
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"GitHub {response.status_code} for {response.url} (rate limit {rate_limit})")
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait (up to `timeout` seconds) and get the same result or error.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def begin(self, key):
+        """Join the call in flight for `key`, or register a new one; returns (call, is_leader)"""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                return call, False
+            call = {'event': threading.Event(), 'result': None, 'error': None}
+            self.calls[key] = call
+            return call, True
+
+    def wait(self, key, call, timeout=None):
+        if not call['event'].wait(timeout):
+            raise TimeoutError(f"Timed out waiting for in-flight call {key}")
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    def finish(self, key, call, result=None, error=None):
+        """Publish the leader's result or error and release the key"""
+        call['result'] = result
+        call['error'] = error
+        with self.lock:
+            self.calls.pop(key, None)
+        call['event'].set()
+
+    def do(self, key, fn, timeout=None):
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(key, call, timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', 60))
+page_flight = SingleFlight()
+language_flight = SingleFlight()
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+# Priority of the GitHub calls made in the current context (copied into worker threads)
+request_priority = contextvars.ContextVar('request_priority', default=PRIORITY_INTERACTIVE)
+
+def map_in_context(executor, fn, items):
+    """executor.map that runs each call in a copy of the caller's context"""
+    futures = [executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+class QuotaExhausted(requests.exceptions.RequestException):
+    """Raised instead of calling GitHub when the remaining quota can't cover the call"""
+
+class QuotaScheduler:
+    """Process-wide view of GitHub rate limits per token and API resource.
+
+    Remaining quota and reset time come from response headers. Each call
+    reserves one unit up front so concurrent analyses share the budget.
+    Background work stops while `background_reserve` calls are still left,
+    leaving them for interactive requests. On buckets with a known limit the
+    reserve shrinks to `background_fraction` of it, but never below
+    `background_floor`, which should cover one cold interactive analysis;
+    on the 60/h unauthenticated bucket that leaves background work only a
+    few calls. Calls that can't be served fail fast with QuotaExhausted
+    instead of sleeping on a worker thread.
+    """
+    def __init__(self, background_reserve=500, background_fraction=0.1, background_floor=50):
+        self.background_reserve = background_reserve
+        self.background_fraction = background_fraction
+        self.background_floor = background_floor
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def _bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None or (bucket['reset'] and bucket['reset'] <= time.time()):
+            bucket = {'remaining': None, 'limit': None, 'reset': 0, 'blocked_until': 0}
+            self.buckets[key] = bucket
+        return bucket
+
+    def acquire(self, key, priority=None):
+        priority = priority or request_priority.get()
+        with self.lock:
+            bucket = self._bucket(key)
+            reserve = 0
+            if priority == PRIORITY_BACKGROUND:
+                reserve = self.background_reserve
+                if bucket['limit']:
+                    reserve = min(reserve, max(int(bucket['limit'] * self.background_fraction), self.background_floor))
+            now = time.time()
+            if bucket['blocked_until'] > now:
+                raise QuotaExhausted(f"GitHub asked us to back off for {int(bucket['blocked_until'] - now)}s")
+            if bucket['remaining'] is not None:
+                if bucket['remaining'] <= reserve:
+                    raise QuotaExhausted(f"GitHub quota exhausted until {int(bucket['reset'])} ({priority})")
+                bucket['remaining'] -= 1
+
+    def release(self, key):
+        """Give back a unit reserved for a call that never reached GitHub"""
+        with self.lock:
+            bucket = self._bucket(key)
+            if bucket['remaining'] is not None and (bucket['limit'] is None or bucket['remaining'] < bucket['limit']):
+                bucket['remaining'] += 1
+
+    def record(self, key, response):
+        headers = response.headers
+        with self.lock:
+            bucket = self._bucket(key)
+            try:
+                if 'X-RateLimit-Remaining' in headers:
+                    bucket['remaining'] = int(headers['X-RateLimit-Remaining'])
+                if 'X-RateLimit-Limit' in headers:
+                    bucket['limit'] = int(headers['X-RateLimit-Limit'])
+                if 'X-RateLimit-Reset' in headers:
+                    bucket['reset'] = int(headers['X-RateLimit-Reset'])
+                if response.status_code in (403, 429) and 'Retry-After' in headers:
+                    bucket['blocked_until'] = time.time() + int(headers['Retry-After'])
+            except ValueError:
+                pass
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {'resource': key[1], 'remaining': bucket['remaining'], 'limit': bucket['limit'], 'reset': bucket['reset']}
+                for key, bucket in self.buckets.items()
+            ]
+
+quota_scheduler = QuotaScheduler(
+    background_reserve=int(os.getenv('BACKGROUND_QUOTA_RESERVE', 500)),
+    background_fraction=float(os.getenv('BACKGROUND_QUOTA_FRACTION', 0.1)),
+    background_floor=int(os.getenv('BACKGROUND_QUOTA_FLOOR', 50))
+)
+
+def quota_key(url, headers):
+    auth = headers.get('Authorization') or ''
+    resource = 'graphql' if url == GITHUB_GRAPHQL_URL else 'core'
+    return hashlib.sha256(auth.encode()).hexdigest(), resource
 
-def get_all_pages(url, headers, max_pages=10):
+class CircuitOpen(requests.exceptions.RequestException):
+    """Raised instead of calling GitHub while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Shared GitHub health state, updated from the outcome of every real call.
+
+    Opens after `failure_threshold` consecutive failures (connection errors,
+    timeouts, 5xx). While open, calls fail fast with CircuitOpen. After
+    `reset_timeout` seconds one half-open probe is let through, and its
+    result closes the circuit again or re-opens it.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+        self.last_success = None
+        self.last_failure = None
+
+    def before_call(self):
+        with self.lock:
+            if self.state == 'closed':
+                return
+            if self.state == 'open' and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True
+                return
+            raise CircuitOpen("GitHub circuit breaker is open")
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+            self.last_success = time.time()
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.last_failure = time.time()
+            self.probing = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"GitHub circuit breaker opened after {self.failures} consecutive failures")
+                self.state = 'open'
+                self.opened_at = time.time()
+
+    def release_probe(self):
+        """Let another call probe after one that ended without a verdict on GitHub's health"""
+        with self.lock:
+            self.probing = False
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'last_success': self.last_success,
+                'last_failure': self.last_failure
+            }
+
+github_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5)),
+    reset_timeout=float(os.getenv('CIRCUIT_RESET_TIMEOUT', 30))
+)
+
+def send_github_request(method, url, headers, **kwargs):
+    """Send one GitHub request under the quota scheduler, the in-flight limit and the circuit breaker"""
+    bucket_key = quota_key(url, headers)
+    try:
+        # Check the breaker first so fast-fails don't spend quota
+        github_breaker.before_call()
+    except CircuitOpen:
+        metrics.inc('gitrecap_github_errors_total', kind='circuit_open')
+        raise
+    try:
+        quota_scheduler.acquire(bucket_key)
+    except QuotaExhausted:
+        metrics.inc('gitrecap_github_errors_total', kind='quota')
+        github_breaker.release_probe()
+        raise
+    try:
+        with github_slots, metrics.timer('gitrecap_github_request_seconds', method=method):
+            response = github_session.request(method, url, headers=headers, **kwargs)
+            body_size = len(response.content)
+    except requests.exceptions.Timeout:
+        metrics.inc('gitrecap_github_errors_total', kind='timeout')
+        github_breaker.record_failure()
+        # No rate-limit headers came back to correct the count
+        quota_scheduler.release(bucket_key)
+        raise
+    except requests.exceptions.ConnectionError:
+        metrics.inc('gitrecap_github_errors_total', kind='connection')
+        github_breaker.record_failure()
+        quota_scheduler.release(bucket_key)
+        raise
+    except requests.exceptions.RequestException:
+        # Chunked/decoding errors, redirect loops: GitHub answered badly, which counts against it
+        metrics.inc('gitrecap_github_errors_total', kind='request')
+        github_breaker.record_failure()
+        raise
+    except Exception:
+        # Not GitHub's fault, but a half-open probe must not stay claimed forever
+        github_breaker.release_probe()
+        raise
+    metrics.inc('gitrecap_github_requests_total', method=method, status=response.status_code)
+    metrics.inc('gitrecap_github_response_bytes_total', body_size)
+    if response.status_code >= 500:
+        github_breaker.record_failure()
+    else:
+        github_breaker.record_success()
+    quota_scheduler.record(bucket_key, response)
+    return response
+
+def etag_cache_key(url, headers):
+    auth = headers.get('Authorization') or ''
+    return url, hashlib.sha256(auth.encode()).hexdigest()
+
+def github_get(url, headers, timeout=10):
+    """GET a GitHub URL through the shared session, revalidating cached bodies with ETags"""
+    key = etag_cache_key(url, headers)
+    with etag_cache_lock:
+        cached = etag_cache.get(key)
+        if cached:
+            etag_cache.move_to_end(key)
+
+    request_headers = dict(headers)
+    if cached:
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        elif cached['last_modified']:
+            request_headers['If-Modified-Since'] = cached['last_modified']
+
+    response = send_github_request('GET', url, request_headers, timeout=timeout)
+
+    if response.status_code == 304 and cached:
+        # 304s don't count against the rate limit; serve the stored body
+        metrics.inc('gitrecap_github_not_modified_total')
+        response.status_code = 200
+        response._content = zlib.decompress(cached['content'])
+        if cached['link'] and 'Link' not in response.headers:
+            response.headers['Link'] = cached['link']
+    elif response.status_code == 200:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with etag_cache_lock:
+                etag_cache[key] = {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'link': response.headers.get('Link'),
+                    'content': zlib.compress(response.content)
+                }
+                etag_cache.move_to_end(key)
+                while len(etag_cache) > ETAG_CACHE_SIZE:
+                    etag_cache.popitem(last=False)
+    return response
+
+class RepoRecord:
+    """The repo fields analyze_github reads, projected out of a GitHub repo object"""
+    __slots__ = (
+        'id', 'name', 'full_name', 'fork', 'stargazers_count', 'watchers_count', 'forks_count', 'size',
+        'html_url', 'description', 'language', 'updated_at', 'pushed_at', 'url', 'languages_url'
+    )
+    COUNT_FIELDS = ('stargazers_count', 'watchers_count', 'forks_count', 'size')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields.get(name)
+            if value is None and name in self.COUNT_FIELDS:
+                value = 0
+            setattr(self, name, value)
+        self.fork = bool(self.fork)
+
+    @classmethod
+    def from_api(cls, data):
+        if not isinstance(data, dict) or 'name' not in data or 'url' not in data:
+            return None
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+class CommitRecord:
+    """A commit reduced to what the activity and sentiment analysis need"""
+    __slots__ = ('sha', 'date', 'message')
+
+    def __init__(self, sha, date, message):
+        self.sha = sha
+        self.date = date
+        self.message = message
+
+    @classmethod
+    def from_api(cls, data):
+        try:
+            return cls(data['sha'], data['commit']['author']['date'], data['commit']['message'])
+        except (KeyError, TypeError):
+            return None
+
+# How a crawl ended: out of pages, stopped at max_pages with more left, or stopped on an error
+PAGES_COMPLETE = 'complete'
+PAGES_TRUNCATED = 'truncated'
+PAGES_FAILED = 'failed'
+
+def get_all_pages(url, headers, max_pages=10, with_status=False, project=None):
+    """Collect every page of a list endpoint, sharing the crawl with concurrent identical calls.
+
+    `project` maps each raw item to a compact record as its page is decoded
+    (items it returns None for are dropped). With `with_status`, returns
+    (items, status) where status is PAGES_COMPLETE, PAGES_TRUNCATED or PAGES_FAILED.
+    """
+    key = (etag_cache_key(url, headers), max_pages, project)
+    try:
+        items, status = page_flight.do(key, lambda: fetch_all_pages(url, headers, max_pages, project), SINGLE_FLIGHT_TIMEOUT)
+        items = list(items)
+    except TimeoutError as e:
+        logger.warning(f"Pagination wait failed: {str(e)}")
+        items, status = [], PAGES_FAILED
+    return (items, status) if with_status else items
+
+def fetch_page(url, headers, project=None):
+    """Fetch one page of a list endpoint; returns (items, response), with items None if the crawl should stop"""
+    try:
+        response = github_get(url, headers, timeout=15)
+        debug_request(response)
+
+        if response.status_code in (403, 429) and 'rate limit' in response.text.lower():
+            # The scheduler has recorded the reset time; return what we have rather than block
+            logger.warning("Rate limit exceeded, stopping pagination")
+            return None, response
+
+        if response.status_code != 200:
+            logger.warning(f"API request failed with status {response.status_code}")
+            return None, response
+
+        data = response.json()
+        if not isinstance(data, list):
+            logger.warning("Unexpected response format")
+            return None, response
+
+        if project:
+            # Keep only the compact records; the raw page is dropped with the response
+            data = [record for record in map(project, data) if record is not None]
+        return data, response
+
+    except (QuotaExhausted, CircuitOpen) as e:
+        logger.info(f"Skipping pagination: {str(e)}")
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Request failed: {str(e)}")
+    except Exception as e:
+        logger.exception(f"Unexpected error during pagination: {str(e)}")
+    return None, None
+
+def remaining_page_urls(response, max_pages):
+    """URLs for pages 2..last (capped at max_pages) from the first page's Link header, and whether the cap cut any off"""
+    next_url = response.links.get('next', {}).get('url')
+    last_url = response.links.get('last', {}).get('url')
+    if not next_url or not last_url:
+        return [], False
+    try:
+        last_page = int(parse_qs(urlparse(last_url).query)['page'][0])
+    except (KeyError, ValueError, IndexError):
+        return [], False
+    truncated = last_page > max_pages
+    if truncated:
+        logger.debug(f"Reached maximum page limit ({max_pages}), stopping pagination")
+
+    parsed = urlparse(next_url)
+    query = parse_qs(parsed.query)
+    urls = []
+    for page in range(2, min(last_page, max_pages) + 1):
+        query['page'] = [str(page)]
+        urls.append(urlunparse(parsed._replace(query=urlencode(query, doseq=True))))
+    return urls, truncated
+
+def fetch_all_pages(url, headers, max_pages=10, project=None):
     items = []
     page_count = 0
+    status = PAGES_FAILED
     
     while url and page_count < max_pages:
-        try:
-            response = requests.get(url, headers=headers, timeout=15)
-            debug_request(response)
-            page_count += 1
-            
-            if response.status_code == 403 and 'rate limit exceeded' in response.text.lower():
-                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - time.time(), 0)
-                if wait_time > 300:  # Don't wait more than 5 minutes
-                    print("Rate limit exceeded, stopping pagination")
-                    break
-                if wait_time > 0:
-                    time.sleep(min(wait_time, 60))  # Cap wait time at 1 minute
-                    continue
-                else:
-                    break
-                    
-            if response.status_code != 200:
-                print(f"API request failed with status {response.status_code}")
-                break
-                
-            data = response.json()
-            if not isinstance(data, list):
-                print("Unexpected response format")
-                break
-                
-            items.extend(data)
-            
-            # Prevent infinite loops
-            next_url = response.links.get('next', {}).get('url')
-            if next_url == url:  # Same URL indicates a problem
-                print("Detected potential infinite loop, breaking")
-                break
-            url = next_url
-            
-            remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-            if remaining < 10:
-                time.sleep(2)
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed: {str(e)}")
+        data, response = fetch_page(url, headers, project)
+        page_count += 1
+        if data is None:
             break
-        except Exception as e:
-            print(f"Unexpected error during pagination: {str(e)}")
+
+        items.extend(data)
+
+        if PARALLEL_PAGINATION and page_count == 1:
+            page_urls, truncated = remaining_page_urls(response, max_pages)
+            if page_urls:
+                # Fetch the rest concurrently and keep pages up to the first failure, in order
+                with ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, len(page_urls))) as executor:
+                    pages = map_in_context(executor, lambda page_url: fetch_page(page_url, headers, project)[0], page_urls)
+                for page in pages:
+                    if page is None:
+                        return items, PAGES_FAILED
+                    items.extend(page)
+                return items, PAGES_TRUNCATED if truncated else PAGES_COMPLETE
+
+        # Prevent infinite loops
+        next_url = response.links.get('next', {}).get('url')
+        if next_url == url:  # Same URL indicates a problem
+            logger.warning("Detected potential infinite loop, breaking")
             break
+        url = next_url
+        if not url:
+            status = PAGES_COMPLETE
             
-    if page_count >= max_pages:
-        print(f"Reached maximum page limit ({max_pages}), stopping pagination")
+    if page_count >= max_pages and url:
+        logger.debug(f"Reached maximum page limit ({max_pages}), stopping pagination")
+        status = PAGES_TRUNCATED
         
-    return items
+    return items, status
 
 def get_language_color(language):
     colors = {
@@ -227,32 +818,173 @@ def normalize_language_percentages(languages):
     
     return normalized
 
-def get_weekly_commits(commits, one_year_ago):
-    weekly_commits = [0] * 52
-    for commit in commits:
-        if isinstance(commit, dict) and 'commit' in commit:
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+DAY_SECONDS = 86400
+
+def parse_commit_timestamp(value):
+    """Parse a GitHub 'YYYY-MM-DDTHH:MM:SSZ' date to epoch seconds (naive UTC)"""
+    if len(value) != 20 or value[-1] != 'Z':
+        raise ValueError(f"Unexpected commit date {value!r}")
+    date = datetime.fromisoformat(value[:19])
+    return (date.toordinal() - EPOCH_ORDINAL) * DAY_SECONDS + date.hour * 3600 + date.minute * 60 + date.second
+
+def to_epoch(date):
+    return (date.toordinal() - EPOCH_ORDINAL) * DAY_SECONDS + date.hour * 3600 + date.minute * 60 + date.second
+
+class CommitActivity:
+    """Compact commit projection: epoch seconds in a typed array plus the messages.
+
+    Commits are parsed once as they are added; every activity aggregate is
+    computed from the integer timestamps.
+    """
+    __slots__ = ('timestamps', 'messages')
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.messages = []
+
+    def add(self, commits):
+        for commit in commits:
             try:
-                date = datetime.strptime(commit['commit']['author']['date'], '%Y-%m-%dT%H:%M:%SZ')
-                days_since = (date - one_year_ago).days
-                if 0 <= days_since < 365:
-                    week_num = days_since // 7
-                    if week_num < 52:
-                        weekly_commits[week_num] += 1
-            except (ValueError, KeyError):
+                self.timestamps.append(parse_commit_timestamp(commit.date))
+                self.messages.append(commit.message)
+            except (ValueError, TypeError):
                 continue
+
+    def summarize(self, one_year_ago, today):
+        commit_time_distribution = [0] * 24
+        day_counts = {}
+        for ts in self.timestamps:
+            commit_time_distribution[(ts % DAY_SECONDS) // 3600] += 1
+            day = ts // DAY_SECONDS
+            day_counts[day] = day_counts.get(day, 0) + 1
+
+        # Flag each of the last 365 days (index 0 is today) and walk them once
+        today_day = today.toordinal() - EPOCH_ORDINAL
+        active = bytearray(365)
+        for day in day_counts:
+            offset = today_day - day
+            if 0 <= offset < 365:
+                active[offset] = 1
+        current_streak = max_streak = 0
+        for flag in active:
+            if flag:
+                current_streak += 1
+                if current_streak > max_streak:
+                    max_streak = current_streak
+            else:
+                current_streak = 0
+
+        weekend_days = sum(1 for day in day_counts if (day + EPOCH_ORDINAL - 1) % 7 >= 5)
+        return {
+            'weekly_commits': get_weekly_commits(self.timestamps, one_year_ago),
+            'commit_time_distribution': commit_time_distribution,
+            'contribution_data': [
+                {'date': datetime.fromordinal(day + EPOCH_ORDINAL).date().isoformat(), 'count': count}
+                for day, count in day_counts.items()
+            ],
+            'total_active_days': len(day_counts),
+            'weekend_days': weekend_days,
+            'max_streak': max_streak,
+            'current_streak': current_streak
+        }
+
+def get_weekly_commits(timestamps, one_year_ago):
+    weekly_commits = [0] * 52
+    # Round a fractional start second up so whole-day offsets match datetime subtraction
+    start = to_epoch(one_year_ago) + (1 if one_year_ago.microsecond else 0)
+    for ts in timestamps:
+        days_since = (ts - start) // DAY_SECONDS
+        if 0 <= days_since < 364:
+            weekly_commits[days_since // 7] += 1
     return weekly_commits
 
-def analyze_commit_sentiment(commits):
-    messages = [c['commit']['message'] for c in commits if isinstance(c, dict) and 'commit' in c]
-    if not messages:
-        return None
-        
-    analysis = {
+# Checked in priority order: the first branch whose keywords appear anywhere wins
+COMMIT_TYPE_PATTERN = re.compile(
+    r'(?=.*(?:fix|bug|error|issue))(?P<bugfix>)'
+    r'|(?=.*(?:add|implement|feature|feat))(?P<feature>)'
+    r'|(?=.*(?:refactor|clean|optimize|improve))(?P<refactor>)'
+    r'|(?=.*(?:doc|readme|comment|wiki))(?P<docs>)'
+    r'|(?=.*(?:chore|update|bump|merge))(?P<chore>)'
+    r'|(?P<other>)',
+    re.DOTALL
+)
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', 50000))
+SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', 200))
+# Worker processes for TextBlob scoring; 0 scores inline on the request thread
+SENTIMENT_WORKERS = int(os.getenv('SENTIMENT_WORKERS', 0))
+polarity_cache = OrderedDict()
+polarity_cache_lock = threading.Lock()
+sentiment_pool = None
+sentiment_pool_lock = threading.Lock()
+
+def score_messages(messages):
+    """TextBlob polarity per message (None when scoring fails); runs in worker processes"""
+    from textblob import TextBlob
+    scores = []
+    for message in messages:
+        try:
+            scores.append(TextBlob(message).sentiment.polarity)
+        except Exception:
+            scores.append(None)
+    return scores
+
+def get_sentiment_pool():
+    global sentiment_pool
+    with sentiment_pool_lock:
+        if sentiment_pool is None:
+            # Forking a threaded server can copy held sqlite/logging/import locks into the child
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            sentiment_pool = ProcessPoolExecutor(max_workers=SENTIMENT_WORKERS, mp_context=multiprocessing.get_context(method))
+        return sentiment_pool
+
+def get_polarities(messages):
+    """Polarity for each message, memoized by message hash and scored in batches"""
+    keys = [hashlib.blake2b(message.encode('utf-8', 'replace'), digest_size=16).digest() for message in messages]
+    scores = {}
+    with polarity_cache_lock:
+        for key in keys:
+            if key in polarity_cache:
+                polarity_cache.move_to_end(key)
+                scores[key] = polarity_cache[key]
+
+    pending = {}
+    for key, message in zip(keys, messages):
+        if key not in scores and key not in pending:
+            pending[key] = message
+    metrics.inc('gitrecap_sentiment_cache_lookups_total', len(keys) - len(pending), result='hit')
+    metrics.inc('gitrecap_sentiment_cache_lookups_total', len(pending), result='miss')
+    if pending:
+        pending_keys = list(pending)
+        batches = [
+            [pending[key] for key in pending_keys[i:i + SENTIMENT_BATCH_SIZE]]
+            for i in range(0, len(pending_keys), SENTIMENT_BATCH_SIZE)
+        ]
+        if SENTIMENT_WORKERS > 0:
+            batch_scores = get_sentiment_pool().map(score_messages, batches)
+        else:
+            batch_scores = map(score_messages, batches)
+        new_scores = dict(zip(pending_keys, (score for batch in batch_scores for score in batch)))
+        scores.update(new_scores)
+        with polarity_cache_lock:
+            polarity_cache.update(new_scores)
+            while len(polarity_cache) > SENTIMENT_CACHE_SIZE:
+                polarity_cache.popitem(last=False)
+
+    return [scores[key] for key in keys]
+
+STOP_WORDS = {"the", "and", "a", "an", "in", "on", "at", "to", "of", "for"}
+
+def digest_commit_messages(messages, polarities=None):
+    """Additive sentiment, commit-type and word tallies for a set of commit messages"""
+    digest = {
+        'messages': len(messages),
+        'polarity': 0,
         'positive': 0,
         'neutral': 0,
         'negative': 0,
-        'average_polarity': 0,
-        'common_words': {},
         'commit_types': {
             'feature': 0,
             'bugfix': 0,
@@ -260,53 +992,1461 @@ def analyze_commit_sentiment(commits):
             'docs': 0,
             'chore': 0,
             'other': 0
-        }
+        },
+        'words': defaultdict(int)
     }
-    
-    word_counts = defaultdict(int)
-    stop_words = {"the", "and", "a", "an", "in", "on", "at", "to", "of", "for"}
 
-    for message in messages:
+    if polarities is None:
+        polarities = get_polarities(messages)
+    for message, polarity in zip(messages, polarities):
+        if polarity is None:
+            continue
+        digest['polarity'] += polarity
+
+        if polarity > 0.2:
+            digest['positive'] += 1
+        elif polarity < -0.2:
+            digest['negative'] += 1
+        else:
+            digest['neutral'] += 1
+
+        msg_lower = message.lower()
+        digest['commit_types'][COMMIT_TYPE_PATTERN.match(msg_lower).lastgroup] += 1
+
+        for word in WORD_PATTERN.findall(msg_lower):
+            if (word not in STOP_WORDS and len(word) > 3 and word.isalpha()):
+                digest['words'][word] += 1
+
+    return digest
+
+def merge_digests(digests):
+    """Sum message digests, e.g. the per-day digests of a rollup window"""
+    merged = digest_commit_messages([])
+    for digest in digests:
+        for key in ('messages', 'polarity', 'positive', 'neutral', 'negative'):
+            merged[key] += digest[key]
+        for commit_type, count in digest['commit_types'].items():
+            merged['commit_types'][commit_type] += count
+        for word, count in digest['words'].items():
+            merged['words'][word] += count
+    return merged
+
+def sentiment_from_digest(digest):
+    if not digest['messages']:
+        return None
+    return {
+        'positive': digest['positive'],
+        'neutral': digest['neutral'],
+        'negative': digest['negative'],
+        'average_polarity': round(digest['polarity'] / digest['messages'], 2),
+        'common_words': dict(sorted(digest['words'].items(), key=lambda x: -x[1])[:10]),
+        'commit_types': dict(digest['commit_types'])
+    }
+
+def analyze_commit_sentiment(messages):
+    if not messages:
+        return None
+    return sentiment_from_digest(digest_commit_messages(messages))
+
+def get_repo_languages(repo, headers):
+    """Return a repo's language byte counts, cached until its pushed_at changes"""
+    if repo.fork:
+        return None
+    cached = language_cache.get(repo.id, repo.pushed_at)
+    if cached is not None:
+        return cached
+
+    def fetch():
         try:
-            blob = TextBlob(message)
-            polarity = blob.sentiment.polarity
-            analysis['average_polarity'] += polarity
-            
-            if polarity > 0.2:
-                analysis['positive'] += 1
-            elif polarity < -0.2:
-                analysis['negative'] += 1
-            else:
-                analysis['neutral'] += 1
-
-            msg_lower = message.lower()
-            if any(word in msg_lower for word in ['fix', 'bug', 'error', 'issue']):
-                analysis['commit_types']['bugfix'] += 1
-            elif any(word in msg_lower for word in ['add', 'implement', 'feature', 'feat']):
-                analysis['commit_types']['feature'] += 1
-            elif any(word in msg_lower for word in ['refactor', 'clean', 'optimize', 'improve']):
-                analysis['commit_types']['refactor'] += 1
-            elif any(word in msg_lower for word in ['doc', 'readme', 'comment', 'wiki']):
-                analysis['commit_types']['docs'] += 1
-            elif any(word in msg_lower for word in ['chore', 'update', 'bump', 'merge']):
-                analysis['commit_types']['chore'] += 1
-            else:
-                analysis['commit_types']['other'] += 1
+            langs_response = github_get(repo.languages_url, headers, timeout=10)
+            if langs_response.status_code == 200:
+                repo_langs = langs_response.json()
+                language_cache.set(repo.id, repo.pushed_at, repo_langs)
+                return repo_langs
+        except requests.exceptions.RequestException:
+            pass
+        return None
+
+    # Concurrent analyses touching the same repo share one fetch
+    try:
+        return language_flight.do((repo.id or repo.languages_url, repo.pushed_at), fetch, SINGLE_FLIGHT_TIMEOUT)
+    except TimeoutError:
+        return None
+
+def fetch_repo_data(repo, username, headers, one_year_ago):
+    """Fetch the language breakdown and last year's commits for a single repo"""
+    with metrics.timer('gitrecap_stage_seconds', stage='language_fetch'):
+        languages = get_repo_languages(repo, headers)
+    with metrics.timer('gitrecap_stage_seconds', stage='commit_crawl'):
+        commits = sync_repo_commits(repo, username, headers, one_year_ago)
+    return languages, commits
+
+def sync_repo_commits(repo, username, headers, one_year_ago):
+    """Bring the stored commits for a repo up to date and return the last year of them.
+
+    Repos whose pushed_at matches the last sync are served from the store
+    without any API call; otherwise only commits since the watermark are fetched.
+    """
+    repo_name = repo.full_name or repo.name
+    pushed_at = repo.pushed_at
+    state = commit_store.get_sync_state(username, repo_name)
+
+    if state and pushed_at and state['pushed_at'] == pushed_at:
+        return commit_store.load_commits(username, repo_name, one_year_ago)
+
+    since = one_year_ago.isoformat()
+    if state and state['watermark'] and state['watermark'] > since:
+        since = state['watermark']
+
+    commits_url = f"{repo.url}/commits?since={since}&author={username}&per_page=100"
+    commits, status = get_all_pages(commits_url, headers, max_pages=MAX_COMMIT_PAGES, with_status=True, project=CommitRecord.from_api)
+    # The 300-commit cap is deliberate for the rolling year, so a truncated crawl still advances the watermark
+    commit_store.save_commits(username, repo_name, commits, pushed_at, status != PAGES_FAILED)
+    return commit_store.load_commits(username, repo_name, one_year_ago)
+
+class CommitStore:
+    """SQLite-backed store of fetched commit summaries with a per-repo high-water mark"""
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS commits ("
+                "username TEXT, repo TEXT, sha TEXT, date TEXT, message TEXT, "
+                "PRIMARY KEY (username, repo, sha))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS repo_sync ("
+                "username TEXT, repo TEXT, pushed_at TEXT, watermark TEXT, synced_at REAL, "
+                "PRIMARY KEY (username, repo))"
+            )
+
+    def get_sync_state(self, username, repo):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT pushed_at, watermark FROM repo_sync WHERE username = ? AND repo = ?",
+                (username.lower(), repo)
+            ).fetchone()
+        return {'pushed_at': row[0], 'watermark': row[1]} if row else None
+
+    def save_commits(self, username, repo, commits, pushed_at, complete):
+        """Store commit summaries and, if the crawl completed, advance the sync state.
+
+        An incomplete crawl keeps the previous watermark and pushed_at so the
+        missing commits are fetched again on the next analysis.
+        """
+        user = username.lower()
+        rows = [(user, repo, commit.sha, commit.date, commit.message) for commit in commits]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?)", rows)
+            if complete:
+                watermark = self.conn.execute(
+                    "SELECT MAX(date) FROM commits WHERE username = ? AND repo = ?", (user, repo)
+                ).fetchone()[0]
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO repo_sync VALUES (?, ?, ?, ?, ?)",
+                    (user, repo, pushed_at, watermark, time.time())
+                )
+        days = [commit.date[:10] for commit in commits if commit.date]
+        if days:
+            rollup_store.mark_dirty(username, repo, min(days), max(days))
+
+    def day_bounds(self, username, repo):
+        """(first day, last day) of the stored commits for a repo, or (None, None)"""
+        with self.lock:
+            first, last = self.conn.execute(
+                "SELECT MIN(date), MAX(date) FROM commits WHERE username = ? AND repo = ?", (username.lower(), repo)
+            ).fetchone()
+        return (first[:10], last[:10]) if first else (None, None)
+
+    def load_day_range(self, username, repo, first_day, last_day):
+        """Return (date, message) for every stored commit on days first_day..last_day ('YYYY-MM-DD')"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT date, message FROM commits WHERE username = ? AND repo = ? AND date >= ? AND date < ? "
+                "ORDER BY date",
+                (username.lower(), repo, first_day, (datetime.fromisoformat(last_day) + timedelta(days=1)).date().isoformat())
+            ).fetchall()
+
+    def load_commits(self, username, repo, since, limit=300):
+        """Return stored commits newer than `since` as CommitRecords, newest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT sha, date, message FROM commits WHERE username = ? AND repo = ? AND date >= ? "
+                "ORDER BY date DESC LIMIT ?",
+                (username.lower(), repo, since.strftime('%Y-%m-%dT%H:%M:%SZ'), limit)
+            ).fetchall()
+        return [CommitRecord(sha, date, message) for sha, date, message in rows]
+
+commit_store = CommitStore(os.getenv('COMMIT_STORE_PATH', 'gitrecap.db'))
+
+class RollupStore:
+    """SQLite per-user, per-day, per-repo commit rollups: counts, hour histograms and message digests.
+
+    Syncs only record which days of a repo changed; those days are rebuilt
+    from the commit store the next time a window is summarized, so the
+    default recap path pays nothing for them. A coverage table remembers
+    which date ranges have been crawled per repo.
+    """
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_rollups ("
+                "username TEXT, day TEXT, repo TEXT, commits INTEGER, hours TEXT, digest TEXT, "
+                "PRIMARY KEY (username, day, repo))"
+            )
+            if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'rollup_dirty'").fetchone() \
+                    and not self.conn.execute("PRAGMA index_list(rollup_dirty)").fetchall():
+                # Older stores kept one row per sync; fold them into one range per repo
+                self.conn.execute("ALTER TABLE rollup_dirty RENAME TO rollup_dirty_old")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollup_dirty ("
+                "username TEXT, repo TEXT, first_day TEXT, last_day TEXT, "
+                "PRIMARY KEY (username, repo))"
+            )
+            if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'rollup_dirty_old'").fetchone():
+                self.conn.execute(
+                    "INSERT INTO rollup_dirty SELECT username, repo, MIN(first_day), MAX(last_day) "
+                    "FROM rollup_dirty_old GROUP BY username, repo"
+                )
+                self.conn.execute("DROP TABLE rollup_dirty_old")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollup_coverage ("
+                "username TEXT, repo TEXT, start_day TEXT, end_day TEXT, synced_at REAL)"
+            )
+
+    def mark_dirty(self, username, repo, first_day, last_day):
+        """Widen the repo's pending rebuild range to include first_day..last_day"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO rollup_dirty VALUES (?, ?, ?, ?) ON CONFLICT (username, repo) DO UPDATE SET "
+                "first_day = MIN(first_day, excluded.first_day), last_day = MAX(last_day, excluded.last_day)",
+                (username.lower(), repo, first_day, last_day)
+            )
+
+    def flush(self, username):
+        """Rebuild every day range a sync has touched for this user since the last flush"""
+        user = username.lower()
+        with self.flush_lock:
+            with self.lock, self.conn:
+                rows = self.conn.execute(
+                    "SELECT repo, first_day, last_day FROM rollup_dirty WHERE username = ?", (user,)
+                ).fetchall()
+                self.conn.execute("DELETE FROM rollup_dirty WHERE username = ?", (user,))
+            for repo, first_day, last_day in rows:
+                self.rebuild(user, repo, first_day, last_day)
+
+    def rebuild(self, username, repo, first_day, last_day):
+        """Recompute the rollup rows for first_day..last_day ('YYYY-MM-DD') from the commit store"""
+        user = username.lower()
+        stored = commit_store.load_day_range(user, repo, first_day, last_day)
+        polarities = get_polarities([message or '' for _, message in stored])
+        by_day = defaultdict(list)
+        for (commit_date, message), polarity in zip(stored, polarities):
+            by_day[commit_date[:10]].append((commit_date, message or '', polarity))
+
+        rows = []
+        for day, day_commits in by_day.items():
+            hours = [0] * 24
+            for commit_date, _, _ in day_commits:
+                hours[int(commit_date[11:13])] += 1
+            digest = digest_commit_messages(
+                [message for _, message, _ in day_commits], [polarity for _, _, polarity in day_commits]
+            )
+            rows.append((user, day, repo, len(day_commits), json.dumps(hours), json.dumps(digest)))
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM daily_rollups WHERE username = ? AND repo = ? AND day >= ? AND day <= ?",
+                (user, repo, first_day, last_day)
+            )
+            self.conn.executemany("INSERT INTO daily_rollups VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def ensure_built(self, username, repo):
+        """Roll up commits stored before this repo had any rollups (e.g. by an older version)"""
+        with self.lock:
+            built = self.conn.execute(
+                "SELECT 1 FROM daily_rollups WHERE username = ? AND repo = ? LIMIT 1", (username.lower(), repo)
+            ).fetchone()
+        if built:
+            return
+        first, last = commit_store.day_bounds(username, repo)
+        if first:
+            self.mark_dirty(username, repo, first, last)
+
+    def uncovered_start(self, username, repo, start, end):
+        """First day of [start, end] not yet crawled for this repo, or None if it is all covered"""
+        with self.lock:
+            covered_to = self.conn.execute(
+                "SELECT MAX(end_day) FROM rollup_coverage WHERE username = ? AND repo = ? AND start_day <= ?",
+                (username.lower(), repo, start.isoformat())
+            ).fetchone()[0]
+        if covered_to is None or covered_to < start.isoformat():
+            return start
+        if covered_to >= end.isoformat():
+            return None
+        return datetime.fromisoformat(covered_to).date() + timedelta(days=1)
+
+    def mark_covered(self, username, repo, start, end):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO rollup_coverage VALUES (?, ?, ?, ?, ?)",
+                (username.lower(), repo, start.isoformat(), end.isoformat(), time.time())
+            )
+
+    def summarize(self, username, start, end):
+        """Sum every repo's rollups over [start, end]: per-day counts, hour histogram and merged digest"""
+        self.flush(username)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT day, commits, hours, digest FROM daily_rollups WHERE username = ? AND day >= ? AND day <= ? "
+                "ORDER BY day",
+                (username.lower(), start.isoformat(), end.isoformat())
+            ).fetchall()
+        day_counts = defaultdict(int)
+        hours = [0] * 24
+        digests = []
+        for day, commits, day_hours, digest in rows:
+            day_counts[day] += commits
+            hours = [a + b for a, b in zip(hours, json.loads(day_hours))]
+            digests.append(json.loads(digest))
+        return {'day_counts': day_counts, 'hours': hours, 'digest': merge_digests(digests)}
 
-            words = re.findall(r'\b\w+\b', message.lower())
-            for word in words:
-                if (word not in stop_words and len(word) > 3 and word.isalpha()):
-                    word_counts[word] += 1
+rollup_store = RollupStore(os.getenv('COMMIT_STORE_PATH', 'gitrecap.db'))
 
+class LanguageCache:
+    """SQLite cache of per-repo language bytes keyed by repo id and pushed_at"""
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS repo_languages ("
+                "repo_id INTEGER PRIMARY KEY, pushed_at TEXT, languages TEXT)"
+            )
+
+    def get(self, repo_id, pushed_at):
+        if repo_id is None or not pushed_at:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT languages FROM repo_languages WHERE repo_id = ? AND pushed_at = ?", (repo_id, pushed_at)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, repo_id, pushed_at, languages):
+        if repo_id is None or not pushed_at or not isinstance(languages, dict):
+            return
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO repo_languages VALUES (?, ?, ?)", (repo_id, pushed_at, json.dumps(languages))
+            )
+
+language_cache = LanguageCache(os.getenv('COMMIT_STORE_PATH', 'gitrecap.db'))
+
+# 'rest' crawls the REST API per repo; 'graphql' batches it (needs a token, falls back to REST)
+FETCH_BACKEND = os.getenv('FETCH_BACKEND', 'rest')
+GITHUB_GRAPHQL_URL = os.getenv('GITHUB_GRAPHQL_URL', f'{GITHUB_API_URL}/graphql')
+
+# 'primary' counts each repo's main language; 'bytes' weights by bytes across all repos
+LANGUAGE_MODE = os.getenv('LANGUAGE_MODE', 'primary')
+
+class MemoryStore:
+    """In-process stand-in for the Redis commands the result cache uses"""
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+def get_shared_store():
+    redis_url = os.getenv('REDIS_URL')
+    if not redis_url:
+        return MemoryStore()
+    try:
+        import redis
+        return redis.Redis.from_url(redis_url, socket_timeout=2)
+    except Exception as e:
+        logger.warning(f"Redis unavailable, falling back to in-memory store: {str(e)}")
+        return MemoryStore()
+
+class ResultCache:
+    """Recap cache with an in-process LRU tier in front of a shared (Redis) tier.
+
+    Entries are fresh for `ttl` seconds, then served stale for up to
+    `stale_ttl` more seconds while a background thread recomputes them.
+    """
+    def __init__(self, compute, store, ttl=900, stale_ttl=3600, max_local=256, flight_timeout=None):
+        self.compute = compute
+        self.store = store
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_local = max_local
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.flight = SingleFlight()
+        self.flight_timeout = flight_timeout
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'fallbacks': 0, 'errors': 0}
+
+    def make_key(self, username, user_token=None):
+        scope = hashlib.sha256(user_token.encode()).hexdigest()[:16] if user_token else 'public'
+        return f"gitrecap:recap:{scope}:{username.lower()}"
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _get_entry(self, key):
+        with self.lock:
+            entry = self.local.get(key)
+            if entry:
+                self.local.move_to_end(key)
+                return entry, 'local_hits'
+        try:
+            raw = self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {str(e)}")
+            self._count('errors')
+            raw = None
+        if raw is None:
+            return None, None
+        entry = json.loads(raw)
+        self._set_local(key, entry)
+        return entry, 'shared_hits'
+
+    def _set_local(self, key, entry):
+        with self.lock:
+            self.local[key] = entry
+            self.local.move_to_end(key)
+            while len(self.local) > self.max_local:
+                self.local.popitem(last=False)
+
+    def set(self, key, data):
+        entry = {'data': data, 'stored_at': time.time()}
+        self._set_local(key, entry)
+        try:
+            self.store.set(key, json.dumps(entry), ex=int(self.ttl + self.stale_ttl))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {str(e)}")
+            self._count('errors')
+        return entry
+
+    def invalidate(self, username, user_token=None):
+        key = self.make_key(username, user_token)
+        with self.lock:
+            self.local.pop(key, None)
+        try:
+            self.store.delete(key)
         except Exception:
+            self._count('errors')
+
+    def _compute_and_store(self, key, username, user_token):
+        return self.flight.do(
+            key,
+            lambda: self.set(key, self.compute(username, user_token))['data'],
+            self.flight_timeout
+        )
+
+    def _refresh(self, key, username, user_token):
+        request_priority.set(PRIORITY_BACKGROUND)
+        try:
+            self._compute_and_store(key, username, user_token)
+            self._count('refreshes')
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {username}: {str(e)}")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get(self, username, user_token=None):
+        """Return the cached recap (refreshing it in the background if stale), or None on a miss"""
+        key = self.make_key(username, user_token)
+        entry, tier = self._get_entry(key)
+        if entry:
+            age = time.time() - entry['stored_at']
+            if age < self.ttl:
+                self._count(tier)
+                return entry['data']
+            if age < self.ttl + self.stale_ttl:
+                self._count('stale_hits')
+                with self.lock:
+                    start_refresh = key not in self.refreshing
+                    self.refreshing.add(key)
+                if start_refresh:
+                    threading.Thread(target=self._refresh, args=(key, username, user_token), daemon=True).start()
+                return entry['data']
+
+        self._count('misses')
+        return None
+
+    def age(self, username, user_token=None):
+        """Seconds since the cached recap was stored, or None if there is none (not counted in stats)"""
+        entry, _ = self._get_entry(self.make_key(username, user_token))
+        return time.time() - entry['stored_at'] if entry else None
+
+    def put(self, username, user_token, data):
+        self.set(self.make_key(username, user_token), data)
+
+    def refresh(self, username, user_token=None):
+        """Recompute and store a recap even if a fresh one is cached"""
+        return self._compute_and_store(self.make_key(username, user_token), username, user_token)
+
+    def get_or_compute(self, username, user_token=None):
+        data = self.get(username, user_token)
+        if data is not None:
+            return data
+        key = self.make_key(username, user_token)
+        try:
+            return self._compute_and_store(key, username, user_token)
+        except AnalysisError as e:
+            # While GitHub is unavailable or rate limited, an expired recap beats an error
+            if e.status < 429:
+                raise
+            with self.lock:
+                entry = self.local.get(key)
+            if entry is None:
+                raise
+            logger.info(f"Serving expired recap for {username}: {e.message}")
+            self._count('fallbacks')
+            return entry['data']
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['local_entries'] = len(self.local)
+        hits = stats['local_hits'] + stats['shared_hits'] + stats['stale_hits']
+        total = hits + stats['misses']
+        stats['hit_ratio'] = round(hits / total, 3) if total else 0
+        return stats
+
+class AnalysisError(Exception):
+    """An analysis failure that maps onto an HTTP error response"""
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def fetch_rest_profile(username, headers):
+    """REST backend: the user and their paginated repos"""
+    try:
+        with metrics.timer('gitrecap_stage_seconds', stage='user_fetch'):
+            user_response = github_get(f'{GITHUB_API_URL}/users/{username}', headers, timeout=10)
+        if user_response.status_code == 404:
+            raise AnalysisError('User not found', 404)
+        if user_response.status_code == 403:
+            raise AnalysisError('GitHub API rate limit exceeded', 429)
+        if user_response.status_code != 200:
+            raise AnalysisError('GitHub API error', user_response.status_code)
+    except QuotaExhausted:
+        raise AnalysisError('GitHub API rate limit exceeded', 429)
+    except CircuitOpen:
+        raise AnalysisError('GitHub API unavailable', 502)
+    except requests.exceptions.RequestException:
+        raise AnalysisError('Failed to fetch user data', 502)
+
+    user_data = user_response.json()
+    with metrics.timer('gitrecap_stage_seconds', stage='repo_pagination'):
+        repos = get_all_pages(
+            f'{GITHUB_API_URL}/users/{username}/repos?per_page=100&sort=pushed', headers, max_pages=MAX_REPO_PAGES, project=RepoRecord.from_api
+        )
+    if not repos:
+        raise AnalysisError('No public repositories found', 404)
+
+    return user_data, repos
+
+def iter_rest_repo_results(username, headers, repos_to_analyze, user_data, one_year_ago):
+    """REST backend: yield (index, (languages, commits)) for each repo as its fetch completes"""
+    workers = max(1, min(MAX_REPO_WORKERS, len(repos_to_analyze)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(contextvars.copy_context().run, fetch_repo_data, repo, username, headers, one_year_ago): index
+            for index, repo in enumerate(repos_to_analyze)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+GRAPHQL_PROFILE_QUERY = """
+query($login: String!, $after: String) {
+  user(login: $login) {
+    id login name bio location company websiteUrl twitterUsername avatarUrl createdAt
+    followers { totalCount }
+    following { totalCount }
+    repositories(first: 100, after: $after, ownerAffiliations: OWNER, privacy: PUBLIC, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId name nameWithOwner isFork stargazerCount forkCount diskUsage url description
+        updatedAt pushedAt
+        watchers { totalCount }
+        primaryLanguage { name }
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+      }
+    }
+  }
+}
+"""
+
+GRAPHQL_HISTORY_FRAGMENT = """
+  r%(index)d: repository(owner: %(owner)s, name: %(name)s) {
+    defaultBranchRef { target { ... on Commit {
+      history(first: 100, since: %(since)s, author: {id: %(author)s}, after: %(after)s) {
+        pageInfo { hasNextPage endCursor }
+        nodes { oid authoredDate message }
+      }
+    } } }
+  }
+"""
+
+def github_graphql(query, headers, variables=None):
+    """POST a GraphQL query; returns `data` or raises AnalysisError"""
+    try:
+        response = send_github_request(
+            'POST', GITHUB_GRAPHQL_URL, headers, json={'query': query, 'variables': variables or {}}, timeout=20
+        )
+        debug_request(response)
+    except QuotaExhausted:
+        raise AnalysisError('GitHub API rate limit exceeded', 429)
+    except CircuitOpen:
+        raise AnalysisError('GitHub API unavailable', 502)
+    except requests.exceptions.RequestException:
+        raise AnalysisError('Failed to fetch user data', 502)
+    if response.status_code == 403 or response.status_code == 429:
+        raise AnalysisError('GitHub API rate limit exceeded', 429)
+    if response.status_code != 200:
+        raise AnalysisError('GitHub API error', 502)
+
+    payload = response.json()
+    errors = payload.get('errors') or []
+    if any(error.get('type') == 'RATE_LIMITED' for error in errors):
+        raise AnalysisError('GitHub API rate limit exceeded', 429)
+    if errors and not payload.get('data'):
+        raise AnalysisError('GitHub API error', 502)
+    return payload.get('data') or {}
+
+def graphql_repo_to_rest(node):
+    """Project a GraphQL repository node into the same RepoRecord the REST path produces"""
+    api_url = f"{GITHUB_API_URL}/repos/{node['nameWithOwner']}"
+    return RepoRecord(
+        id=node.get('databaseId'),
+        name=node['name'],
+        full_name=node['nameWithOwner'],
+        fork=node.get('isFork', False),
+        stargazers_count=node.get('stargazerCount'),
+        watchers_count=(node.get('watchers') or {}).get('totalCount'),
+        forks_count=node.get('forkCount'),
+        size=node.get('diskUsage'),
+        html_url=node['url'],
+        description=node.get('description'),
+        language=(node.get('primaryLanguage') or {}).get('name'),
+        updated_at=node.get('updatedAt'),
+        pushed_at=node.get('pushedAt'),
+        url=api_url,
+        languages_url=f"{api_url}/languages"
+    )
+
+def fetch_graphql_profile(username, headers):
+    """GraphQL backend: the same (user_data, repos) as fetch_rest_profile, one query per 100 repos"""
+    with metrics.timer('gitrecap_stage_seconds', stage='user_fetch'):
+        data = github_graphql(GRAPHQL_PROFILE_QUERY, headers, {'login': username})
+    user = data.get('user')
+    if not user:
+        raise AnalysisError('User not found', 404)
+
+    nodes = list(user['repositories']['nodes'])
+    page_info = user['repositories']['pageInfo']
+    with metrics.timer('gitrecap_stage_seconds', stage='repo_pagination'):
+        for _ in range(MAX_REPO_PAGES - 1):
+            if not page_info['hasNextPage']:
+                break
+            try:
+                page = github_graphql(GRAPHQL_PROFILE_QUERY, headers, {'login': username, 'after': page_info['endCursor']})
+                repositories = page['user']['repositories']
+            except (AnalysisError, KeyError, TypeError) as e:
+                # Like a failed REST page, keep the repos fetched so far
+                logger.warning(f"Repository pagination stopped: {str(e)}")
+                break
+            nodes.extend(repositories['nodes'])
+            page_info = repositories['pageInfo']
+
+    user_data = {
+        'login': user['login'],
+        'node_id': user['id'],
+        'avatar_url': user.get('avatarUrl'),
+        'created_at': user.get('createdAt') or '',
+        'name': user.get('name'),
+        'bio': user.get('bio'),
+        'location': user.get('location'),
+        'company': user.get('company'),
+        'blog': user.get('websiteUrl'),
+        'twitter_username': user.get('twitterUsername'),
+        'followers': user['followers']['totalCount'],
+        'following': user['following']['totalCount']
+    }
+
+    repos = []
+    for node in nodes:
+        repo = graphql_repo_to_rest(node)
+        if not repo.fork:
+            # Seed the language cache so get_repo_languages never needs REST for these repos
+            language_cache.set(repo.id, repo.pushed_at, {
+                edge['node']['name']: edge['size'] for edge in node['languages']['edges']
+            })
+        repos.append(repo)
+    if not repos:
+        raise AnalysisError('No public repositories found', 404)
+
+    return user_data, repos
+
+def iter_graphql_repo_results(username, headers, repos_to_analyze, user_data, one_year_ago):
+    """GraphQL backend: batch the commit history of every changed repo, one query per page of 100.
+
+    Repos with more history are paged with `after` cursors, all of them in the
+    same query, up to the REST crawl's MAX_COMMIT_PAGES.
+    """
+    pending = {}
+    for index, repo in enumerate(repos_to_analyze):
+        state = commit_store.get_sync_state(username, repo.full_name)
+        if state and repo.pushed_at and state['pushed_at'] == repo.pushed_at:
             continue
+        since = one_year_ago.strftime('%Y-%m-%dT%H:%M:%SZ')
+        if state and state['watermark'] and state['watermark'] > since:
+            since = state['watermark']
+        pending[index] = {'repo': repo, 'since': since, 'after': None, 'commits': []}
+
+    with metrics.timer('gitrecap_stage_seconds', stage='commit_crawl'):
+        for page in range(MAX_COMMIT_PAGES):
+            if not pending:
+                break
+            fragments = []
+            for index, crawl in pending.items():
+                owner, name = crawl['repo'].full_name.split('/', 1)
+                fragments.append(GRAPHQL_HISTORY_FRAGMENT % {
+                    'index': index, 'owner': json.dumps(owner), 'name': json.dumps(name),
+                    'since': json.dumps(crawl['since']), 'author': json.dumps(user_data['node_id']),
+                    'after': json.dumps(crawl['after'])
+                })
+            try:
+                history_data = github_graphql('query {%s}' % ''.join(fragments), headers)
+            except AnalysisError as e:
+                if page == 0:
+                    raise
+                # Keep what earlier pages fetched without advancing the watermark, as a failed REST page does
+                logger.warning(f"Commit history pagination stopped: {str(e)}")
+                for crawl in pending.values():
+                    commit_store.save_commits(username, crawl['repo'].full_name, crawl['commits'], crawl['repo'].pushed_at, False)
+                break
+
+            for index, crawl in list(pending.items()):
+                target = ((history_data.get(f'r{index}') or {}).get('defaultBranchRef') or {}).get('target') or {}
+                history = target.get('history')
+                if history is None:
+                    if page:
+                        commit_store.save_commits(username, crawl['repo'].full_name, crawl['commits'], crawl['repo'].pushed_at, False)
+                    del pending[index]
+                    continue
+                crawl['commits'].extend(CommitRecord(node['oid'], node['authoredDate'], node['message']) for node in history['nodes'])
+                if history['pageInfo']['hasNextPage'] and page + 1 < MAX_COMMIT_PAGES:
+                    crawl['after'] = history['pageInfo']['endCursor']
+                    continue
+                # Reaching MAX_COMMIT_PAGES counts as a complete sync, as it does for the REST crawl
+                commit_store.save_commits(username, crawl['repo'].full_name, crawl['commits'], crawl['repo'].pushed_at, True)
+                del pending[index]
+
+    for index, repo in enumerate(repos_to_analyze):
+        yield index, (get_repo_languages(repo, headers), commit_store.load_commits(username, repo.full_name, one_year_ago))
+
+# Windowed recaps: arbitrary date ranges aggregated from the daily rollups
+MAX_WINDOW_DAYS = int(os.getenv('MAX_WINDOW_DAYS', 1096))
+MAX_HISTORY_YEARS = int(os.getenv('MAX_HISTORY_YEARS', 5))
+# Pages fetched per repo and range when backfilling commits older than the rolling year
+BACKFILL_MAX_PAGES = int(os.getenv('BACKFILL_MAX_PAGES', 10))
+GITHUB_LAUNCH = datetime(2008, 1, 1).date()
+
+def shift_year(day, years):
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        # Feb 29 in a non-leap year
+        return day.replace(year=day.year + years, day=28)
+
+def parse_window(args):
+    """Read `year` or `from`/`to` query parameters; None means the default rolling year.
+
+    The comparison window is the same dates a year earlier for `year`, and the
+    equally long period just before `from` otherwise.
+    """
+    year, start, end = args.get('year'), args.get('from'), args.get('to')
+    if not (year or start or end):
+        return None
+    if year and (start or end):
+        raise AnalysisError('Use either year or from/to, not both', 400)
+
+    today = datetime.now().date()
+    try:
+        if year:
+            start = datetime(int(year), 1, 1).date()
+            end = min(datetime(int(year), 12, 31).date(), today)
+            previous = (shift_year(start, -1), shift_year(end, -1))
+        else:
+            start = datetime.fromisoformat(start).date() if start else today - timedelta(days=364)
+            end = min(datetime.fromisoformat(end).date(), today) if end else today
+            span = end - start + timedelta(days=1)
+            previous = (start - span, start - timedelta(days=1))
+    except ValueError:
+        raise AnalysisError('Invalid window: use year=YYYY or from/to=YYYY-MM-DD', 400)
+
+    if start < GITHUB_LAUNCH or start > end:
+        raise AnalysisError(f'Window must start on or after {GITHUB_LAUNCH.isoformat()} and before it ends', 400)
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        raise AnalysisError(f'Windows are limited to {MAX_WINDOW_DAYS} days', 400)
+    return {'from': start, 'to': end, 'previous_from': previous[0], 'previous_to': previous[1]}
 
-    if len(messages) > 0:
-        analysis['average_polarity'] = round(analysis['average_polarity'] / len(messages), 2)
+def window_repos(repos, start):
+    """Repos that can hold commits from `start` onwards, most recently pushed first"""
+    return [repo for repo in repos if not repo.pushed_at or repo.pushed_at >= start.isoformat()][:10]
+
+def sync_repo_window(repo, username, headers, ranges, one_year_ago):
+    """Make sure a repo's rollups cover each (start, end) range, crawling only what is missing.
+
+    Days inside the rolling year come from the regular watermark sync; older
+    days are backfilled once with since/until and recorded as covered. A
+    backfill that hits BACKFILL_MAX_PAGES keeps going with `until` moved to
+    the oldest commit seen; a range is only covered once its crawl completes.
+    """
+    repo_name = repo.full_name or repo.name
+    boundary = one_year_ago.date()
+    rollup_store.ensure_built(username, repo_name)
+    if any(end > boundary for _, end in ranges):
+        sync_repo_commits(repo, username, headers, one_year_ago)
+
+    for start, end in ranges:
+        end = min(end, boundary)
+        if start > end:
+            continue
+        crawl_from = rollup_store.uncovered_start(username, repo_name, start, end)
+        if crawl_from is None:
+            continue
+        if repo.pushed_at and repo.pushed_at < crawl_from.isoformat():
+            rollup_store.mark_covered(username, repo_name, start, end)
+            continue
+        until = f"{end.isoformat()}T23:59:59Z"
+        while True:
+            commits_url = (
+                f"{repo.url}/commits?since={crawl_from.isoformat()}T00:00:00Z&until={until}"
+                f"&author={username}&per_page=100"
+            )
+            commits, status = get_all_pages(commits_url, headers, max_pages=BACKFILL_MAX_PAGES, with_status=True, project=CommitRecord.from_api)
+            # Backfilled commits are older than the watermark, so the sync state is left alone
+            commit_store.save_commits(username, repo_name, commits, repo.pushed_at, False)
+            if status == PAGES_COMPLETE:
+                rollup_store.mark_covered(username, repo_name, start, end)
+            if status != PAGES_TRUNCATED or not commits:
+                break
+            # `until` is inclusive, so commits at the oldest timestamp are fetched again and ignored by the store
+            oldest = min(commit.date for commit in commits)
+            if oldest >= until:
+                logger.warning(f"Backfill of {repo_name} made no progress before {until}, leaving it uncovered")
+                break
+            until = oldest
+
+def iter_window_repo_results(username, headers, repos_to_analyze, ranges, one_year_ago):
+    """Window mode: sync each repo's rollups for every range; yields (index, (languages, []))"""
+    def sync(repo):
+        with metrics.timer('gitrecap_stage_seconds', stage='commit_crawl'):
+            sync_repo_window(repo, username, headers, ranges, one_year_ago)
+        with metrics.timer('gitrecap_stage_seconds', stage='language_fetch'):
+            return get_repo_languages(repo, headers), []
+
+    workers = max(1, min(MAX_REPO_WORKERS, len(repos_to_analyze)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(contextvars.copy_context().run, sync, repo): index for index, repo in enumerate(repos_to_analyze)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def summarize_window(rollup, start, end):
+    """CommitActivity.summarize's output for rolled-up days in [start, end]"""
+    start_ordinal = start.toordinal()
+    span = end.toordinal() - start_ordinal + 1
+    weekly_commits = [0] * ((span + 6) // 7)
+    active = bytearray(span)
+    contribution_data = []
+    weekend_days = 0
+    for day, count in rollup['day_counts'].items():
+        day_date = datetime.fromisoformat(day).date()
+        offset = day_date.toordinal() - start_ordinal
+        weekly_commits[offset // 7] += count
+        active[offset] = 1
+        if day_date.weekday() >= 5:
+            weekend_days += 1
+        contribution_data.append({'date': day, 'count': count})
+
+    # Walk forward so the running streak at the end is the one still alive on the last day
+    current_streak = max_streak = 0
+    for flag in active:
+        if flag:
+            current_streak += 1
+            if current_streak > max_streak:
+                max_streak = current_streak
+        else:
+            current_streak = 0
+
+    return {
+        'weekly_commits': weekly_commits,
+        'commit_time_distribution': rollup['hours'],
+        'contribution_data': contribution_data,
+        'total_active_days': len(contribution_data),
+        'weekend_days': weekend_days,
+        'max_streak': max_streak,
+        'current_streak': current_streak,
+        'days': span
+    }
+
+def window_totals(summary, digest):
+    hours = summary['commit_time_distribution']
+    return {
+        'total_commits': sum(hours),
+        'active_days': summary['total_active_days'],
+        'max_streak': summary['max_streak'],
+        'weekend_days': summary['weekend_days'],
+        'most_active_hour': max(range(24), key=lambda x: hours[x]),
+        'average_polarity': round(digest['polarity'] / digest['messages'], 2) if digest['messages'] else 0
+    }
+
+def compare_windows(current, previous):
+    """Per-metric current/previous values with absolute and percentage change"""
+    comparison = {}
+    for metric in ('total_commits', 'active_days', 'max_streak', 'weekend_days', 'average_polarity'):
+        change = round(current[metric] - previous[metric], 2)
+        comparison[metric] = {
+            'current': current[metric],
+            'previous': previous[metric],
+            'change': change,
+            'change_pct': round(change / previous[metric] * 100, 1) if previous[metric] else None
+        }
+    return comparison
+
+def select_backend(user_token):
+    """(profile fetcher, repo results iterator) for the configured backend"""
+    if FETCH_BACKEND == 'graphql' and user_token:
+        return fetch_graphql_profile, iter_graphql_repo_results
+    return fetch_rest_profile, iter_rest_repo_results
+
+def merge_recap_section(recap, fragment):
+    """Deep-merge a section fragment into the recap being assembled"""
+    for key, value in fragment.items():
+        if isinstance(value, dict) and isinstance(recap.get(key), dict):
+            merge_recap_section(recap[key], value)
+        else:
+            recap[key] = value
+    return recap
+
+def iter_recap(username, user_token=None, window=None):
+    """Build the recap in stages, yielding (section, fragment) as each part is ready.
+
+    Merging every fragment except 'progress' with merge_recap_section gives
+    the full payload that build_recap returns. With a `window` from
+    parse_window, activity and sentiment come from the daily rollups and a
+    'comparison' section is added.
+    """
+    headers = get_headers(user_token)
+    one_year_ago = datetime.now() - timedelta(days=365)
+    fetch_profile, iter_repo_results = select_backend(user_token)
+    user_data, repos = fetch_profile(username, headers)
+
+    yield 'profile', {
+        'profile': {
+            'username': username,
+            'avatar_url': user_data.get('avatar_url'),
+            'join_date': user_data.get('created_at', '')[:10],
+            'name': user_data.get('name'),
+            'bio': user_data.get('bio'),
+            'location': user_data.get('location'),
+            'company': user_data.get('company'),
+            'blog': user_data.get('blog'),
+            'twitter_username': user_data.get('twitter_username')
+        }
+    }
+
+    top_repos = sorted(
+        [repo for repo in repos if not repo.fork],
+        key=lambda x: x.stargazers_count,
+        reverse=True
+    )[:5]
+
+    # Calculate additional insights
+    total_repos = len([repo for repo in repos if not repo.fork])
+    total_forks = len([repo for repo in repos if repo.fork])
+    total_stars = sum(repo.stargazers_count for repo in repos)
+    total_watchers = sum(repo.watchers_count for repo in repos)
+
+    # Repository insights
+    repo_sizes = [repo.size for repo in repos if not repo.fork]
+    avg_repo_size = sum(repo_sizes) / len(repo_sizes) if repo_sizes else 0
+
+    # Collaboration patterns
+    collaboration_score = 0
+    if total_repos > 0:
+        repos_with_contributors = sum(1 for repo in repos if repo.forks_count > 0)
+        collaboration_score = (repos_with_contributors / total_repos) * 100
+
+    yield 'repo_stats', {
+        'stats': {
+            'repos': total_repos,
+            'forks': total_forks,
+            'stars': total_stars,
+            'watchers': total_watchers,
+            'followers': user_data.get('followers', 0),
+            'following': user_data.get('following', 0),
+            'avg_repo_size': round(avg_repo_size, 1),
+            'collaboration_score': round(collaboration_score, 1),
+            'activity': {
+                'top_repos': [{
+                    'name': repo.name,
+                    'stars': repo.stargazers_count,
+                    'forks': repo.forks_count,
+                    'description': repo.description,
+                    'url': repo.html_url,
+                    'language': repo.language,
+                    'size': repo.size,
+                    'updated_at': repo.updated_at
+                } for repo in top_repos]
+            }
+        }
+    }
+
+    if window:
+        ranges = [(window['from'], window['to']), (window['previous_from'], window['previous_to'])]
+        repos_to_analyze = window_repos(repos, window['previous_from'])
+        repo_iter = iter_window_repo_results(username, headers, repos_to_analyze, ranges, one_year_ago)
     else:
-        analysis['average_polarity'] = 0
-    analysis['common_words'] = dict(sorted(word_counts.items(), key=lambda x: -x[1])[:10])
-    return analysis
+        # Limit to top 10 most recently pushed repos for MVP
+        repos_to_analyze = repos[:10]
+        repo_iter = iter_repo_results(username, headers, repos_to_analyze, user_data, one_year_ago)
+    repo_results = [None] * len(repos_to_analyze)
+    for completed, (index, result) in enumerate(repo_iter, 1):
+        repo_results[index] = result
+        yield 'progress', {'repo': repos_to_analyze[index].name, 'completed': completed, 'total': len(repos_to_analyze)}
+
+    # Aggregation is timed around the yields so slow stream consumers don't count
+    aggregation_start = time.perf_counter()
+    language_counts = defaultdict(int)
+    activity = CommitActivity()
+
+    # Merge in repo order so results don't depend on completion order
+    repo_langs_list = [langs for langs, _ in repo_results]
+    for repo_langs, commits in repo_results:
+        if repo_langs and LANGUAGE_MODE != 'bytes':
+            primary_lang = max(repo_langs.items(), key=lambda x: x[1])[0]
+            language_counts[primary_lang] += 1
+        activity.add(commits)
+    del repo_results
+
+    if LANGUAGE_MODE == 'bytes':
+        # Byte-weighted shares across every owned repo, not just the top 10
+        all_repo_langs = repo_langs_list
+        other_repos = [repo for repo in repos[10:] if not repo.fork]
+        if other_repos:
+            with ThreadPoolExecutor(max_workers=max(1, min(MAX_REPO_WORKERS, len(other_repos)))) as executor:
+                all_repo_langs.extend(map_in_context(executor, lambda repo: get_repo_languages(repo, headers), other_repos))
+        for repo_langs in all_repo_langs:
+            for lang, byte_count in (repo_langs or {}).items():
+                language_counts[lang] += byte_count
+
+    top_languages = []
+    if language_counts:
+        top_languages = sorted([
+            {
+                'name': lang,
+                'count': count,
+                'color': get_language_color(lang)
+            }
+            for lang, count in language_counts.items()
+        ], key=lambda x: -x['count'])
+
+        top_languages = normalize_language_percentages(top_languages)
+
+    favorite_language = top_languages[0]['name'] if top_languages else "None"
+    aggregation_seconds = time.perf_counter() - aggregation_start
+    yield 'languages', {'stats': {'languages': top_languages, 'favorite_language': favorite_language}}
+
+    aggregation_start = time.perf_counter()
+    if window:
+        rollup = rollup_store.summarize(username, window['from'], window['to'])
+        summary = summarize_window(rollup, window['from'], window['to'])
+    else:
+        summary = activity.summarize(one_year_ago, datetime.now().date())
+    window_days = summary.get('days', 365)
+    weekly_commits = summary['weekly_commits']
+    commit_time_distribution = summary['commit_time_distribution']
+    max_streak = summary['max_streak']
+    current_streak = summary['current_streak']
+
+    # Activity patterns
+    active_hours = [i for i, count in enumerate(commit_time_distribution) if count > 0]
+    most_active_hour = max(range(24), key=lambda x: commit_time_distribution[x]) if commit_time_distribution else 0
+    total_active_days = summary['total_active_days']
+    metrics.observe('gitrecap_stage_seconds', aggregation_seconds + time.perf_counter() - aggregation_start, stage='aggregation')
+
+    yield 'activity', {
+        'stats': {
+            'activity': {
+                'weekly_commits': weekly_commits,
+                'streak': max_streak,
+                'current_streak': current_streak,
+                'total_active_days': total_active_days,
+                'commit_time_distribution': commit_time_distribution,
+                'most_active_hour': most_active_hour,
+                'active_hours': active_hours,
+                'contribution_data': summary['contribution_data']
+            }
+        }
+    }
+
+    with metrics.timer('gitrecap_stage_seconds', stage='sentiment'):
+        sentiment = sentiment_from_digest(rollup['digest']) if window else analyze_commit_sentiment(activity.messages)
+    if sentiment:
+        yield 'sentiment', {'sentiment': sentiment}
+
+    total_commits = sum(commit_time_distribution)
+    night_owl = total_commits > 0 and sum(commit_time_distribution[22:] + commit_time_distribution[:4]) > total_commits * 0.4
+    weekend_warrior = summary['total_active_days'] > 0 and summary['weekend_days'] > summary['total_active_days'] * 0.3
+    developer_personality = "Night Owl" if night_owl else "Weekend Warrior" if weekend_warrior else "Consistent Contributor"
+
+    yield 'insights', {
+        'stats': {
+            'developer_personality': developer_personality,
+            'longest_streak': max_streak,
+            'insights': {
+                'productivity_score': round((total_active_days / window_days) * 100, 1) if total_active_days > 0 else 0,
+                'consistency_score': round((max_streak / window_days) * 100, 1) if max_streak > 0 else 0,
+                'collaboration_level': 'High' if collaboration_score > 50 else 'Medium' if collaboration_score > 20 else 'Low',
+                'activity_pattern': 'Night Owl' if most_active_hour >= 22 or most_active_hour <= 4 else 'Early Bird' if most_active_hour <= 8 else 'Day Developer',
+                'project_focus': 'Open Source' if total_stars > 100 else 'Personal Projects' if total_repos > 10 else 'Professional',
+                'experience_level': 'Veteran' if total_repos > 50 else 'Experienced' if total_repos > 20 else 'Intermediate' if total_repos > 5 else 'Beginner'
+            }
+        }
+    }
+
+    if window:
+        previous_rollup = rollup_store.summarize(username, window['previous_from'], window['previous_to'])
+        previous_summary = summarize_window(previous_rollup, window['previous_from'], window['previous_to'])
+        yield 'comparison', {
+            'window': {key: value.isoformat() for key, value in window.items()},
+            'comparison': compare_windows(
+                window_totals(summary, rollup['digest']),
+                window_totals(previous_summary, previous_rollup['digest'])
+            )
+        }
+
+def build_history(username, user_token, years):
+    """Per-calendar-year totals for the last `years` years (this year to date) with year-over-year changes"""
+    headers = get_headers(user_token)
+    fetch_profile, _ = select_backend(user_token)
+    user_data, repos = fetch_profile(username, headers)
+
+    today = datetime.now().date()
+    ranges = [
+        (datetime(year, 1, 1).date(), min(datetime(year, 12, 31).date(), today))
+        for year in range(today.year - years + 1, today.year + 1)
+    ]
+    one_year_ago = datetime.now() - timedelta(days=365)
+    for _ in iter_window_repo_results(username, headers, window_repos(repos, ranges[0][0]), ranges, one_year_ago):
+        pass
+
+    history = []
+    previous = None
+    for start, end in ranges:
+        rollup = rollup_store.summarize(username, start, end)
+        summary = summarize_window(rollup, start, end)
+        totals = window_totals(summary, rollup['digest'])
+        entry = {'year': start.year, 'from': start.isoformat(), 'to': end.isoformat(), **totals}
+        entry['commit_types'] = rollup['digest']['commit_types']
+        if previous is not None:
+            entry['change'] = compare_windows(totals, previous)
+        history.append(entry)
+        previous = totals
+
+    return {
+        'profile': {'username': username, 'avatar_url': user_data.get('avatar_url'), 'name': user_data.get('name')},
+        'years': history
+    }
+
+def build_recap(username, user_token=None, window=None):
+    """Crawl GitHub for a (sanitized) username and build the full recap payload"""
+    response_data = {}
+    for section, fragment in iter_recap(username, user_token, window):
+        if section != 'progress':
+            merge_recap_section(response_data, fragment)
+    return response_data
+
+result_cache = ResultCache(
+    build_recap,
+    get_shared_store(),
+    ttl=int(os.getenv('RESULT_CACHE_TTL', 900)),
+    stale_ttl=int(os.getenv('RESULT_CACHE_STALE_TTL', 3600)),
+    max_local=int(os.getenv('RESULT_CACHE_LOCAL_SIZE', 256)),
+    flight_timeout=SINGLE_FLIGHT_TIMEOUT
+)
+
+# Usernames looked up interactively; the busiest ones are precomputed alongside TRENDING_USERS
+LOOKUP_COUNTS_SIZE = int(os.getenv('LOOKUP_COUNTS_SIZE', 5000))
+lookup_counts = defaultdict(float)
+lookup_counts_lock = threading.Lock()
+
+def record_lookup(username):
+    with lookup_counts_lock:
+        lookup_counts[username.lower()] += 1
+        if len(lookup_counts) > LOOKUP_COUNTS_SIZE:
+            for name, _ in sorted(lookup_counts.items(), key=lambda item: item[1])[:len(lookup_counts) // 2]:
+                del lookup_counts[name]
+
+def popular_usernames(limit):
+    """Most-requested usernames; counts halve on every call so old spikes fade"""
+    with lookup_counts_lock:
+        popular = sorted(lookup_counts, key=lookup_counts.get, reverse=True)[:limit]
+        for name in list(lookup_counts):
+            lookup_counts[name] /= 2
+            if lookup_counts[name] < 0.5:
+                del lookup_counts[name]
+    return popular
+
+class JobQueue:
+    """In-process analysis jobs run off the request threads.
+
+    Each job carries the priority its GitHub calls run at: user-submitted
+    jobs are interactive and are picked before background precompute work.
+    Jobs for the same user and token are deduplicated while queued or running;
+    an interactive submit takes over a queued background job and moves it up.
+    Finished jobs keep their result (or error) until they fall out of history,
+    except precompute jobs, whose recaps already live in the result cache.
+    """
+
+    def __init__(self, workers=2, history=500):
+        self.workers = workers
+        self.history = history
+        self.queue = queue.PriorityQueue()
+        self.sequence = 0
+        self.jobs = OrderedDict()
+        self.active = {}
+        self.lock = threading.Lock()
+        self.started = False
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'gitrecap-job-{i}', daemon=True).start()
+
+    def submit(self, username, user_token=None, refresh=False, source='api', priority=PRIORITY_INTERACTIVE):
+        """Queue an analysis, or return the job already queued or running for this user"""
+        self.start()
+        key = result_cache.make_key(username, user_token)
+        with self.lock:
+            job_id = self.active.get(key)
+            if job_id is not None:
+                job = self.jobs[job_id]
+                if source != 'precompute':
+                    job['source'] = source
+                if priority == PRIORITY_INTERACTIVE and job['priority'] != priority and job['status'] == 'queued':
+                    # The old background entry is skipped when a worker reaches it
+                    job['priority'] = priority
+                    self.sequence += 1
+                    self.queue.put((0, self.sequence, (job, key, user_token, refresh)))
+                return job
+            job = {
+                'id': uuid.uuid4().hex,
+                'username': username,
+                'source': source,
+                'priority': priority,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None
+            }
+            self.jobs[job['id']] = job
+            self.active[key] = job['id']
+            while len(self.jobs) > self.history:
+                oldest_id, oldest = next(iter(self.jobs.items()))
+                if oldest['status'] in ('queued', 'running'):
+                    break
+                del self.jobs[oldest_id]
+            self.sequence += 1
+            rank = 0 if priority == PRIORITY_INTERACTIVE else 1
+            self.queue.put((rank, self.sequence, (job, key, user_token, refresh)))
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _work(self):
+        while True:
+            _, _, (job, key, user_token, refresh) = self.queue.get()
+            with self.lock:
+                if job['status'] != 'queued':
+                    continue
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+            priority = request_priority.set(job['priority'])
+            try:
+                result = analyze_member(job['username'], user_token, refresh=refresh)
+            finally:
+                request_priority.reset(priority)
+            with self.lock:
+                if 'error' in result:
+                    job.update(status='failed', error=result['error'], error_status=result['status'])
+                elif job['source'] == 'precompute':
+                    job['status'] = 'done'
+                else:
+                    job.update(status='done', result=result)
+                job['finished_at'] = time.time()
+                self.active.pop(key, None)
+            metrics.inc('gitrecap_jobs_total', source=job['source'], status=job['status'])
+
+    def snapshot(self):
+        with self.lock:
+            statuses = defaultdict(int)
+            for job in self.jobs.values():
+                statuses[job['status']] += 1
+        return {'workers': self.workers, 'queued': statuses['queued'], 'jobs': dict(statuses)}
+
+job_queue = JobQueue(
+    workers=int(os.getenv('JOB_WORKERS', 2)),
+    history=int(os.getenv('JOB_HISTORY', 500))
+)
+
+# Seconds between precompute rounds for trending and popular users; 0 disables them
+PRECOMPUTE_INTERVAL = int(os.getenv('PRECOMPUTE_INTERVAL', 900))
+PRECOMPUTE_POPULAR = int(os.getenv('PRECOMPUTE_POPULAR', 10))
+
+def precompute_targets():
+    targets = [user['username'] for user in TRENDING_USERS]
+    seen = {username.lower() for username in targets}
+    for username in popular_usernames(PRECOMPUTE_POPULAR):
+        if username not in seen:
+            seen.add(username)
+            targets.append(username)
+    return targets
+
+def precompute_recaps():
+    """Refresh trending and popular recaps on a timer so those lookups are cache reads"""
+    while True:
+        queued = 0
+        for username in precompute_targets():
+            age = result_cache.age(username)
+            if age is not None and age < result_cache.ttl:
+                continue
+            job_queue.submit(username, refresh=True, source='precompute', priority=PRIORITY_BACKGROUND)
+            queued += 1
+        logger.info(f"Queued precompute for {queued} users")
+        time.sleep(PRECOMPUTE_INTERVAL)
+
+precompute_started = False
+precompute_lock = threading.Lock()
+
+def start_precompute():
+    """Start the precompute timer once per process; called by the server entry points, not on import"""
+    global precompute_started
+    with precompute_lock:
+        if precompute_started or PRECOMPUTE_INTERVAL <= 0:
+            return
+        precompute_started = True
+    threading.Thread(target=precompute_recaps, name='gitrecap-precompute', daemon=True).start()
+
+def create_app():
+    """waitress-serve --call entry point: the app with its background workers running"""
+    start_precompute()
+    return app
+
+# Seconds browsers and CDNs may reuse a recap before revalidating it with If-None-Match
+RECAP_MAX_AGE = int(os.getenv('RECAP_MAX_AGE', 300))
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+# Compressed bodies by (ETag, encoding), so cache hits don't recompress the same recap
+RENDERED_CACHE_SIZE = int(os.getenv('RENDERED_CACHE_SIZE', 64))
+rendered_cache = OrderedDict()
+rendered_cache_lock = threading.Lock()
+
+def negotiate_encoding(accept_encoding):
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    for coding in ('br', 'gzip'):
+        if coding == 'br' and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+def compress_body(etag, encoding, body):
+    key = (etag, encoding)
+    with rendered_cache_lock:
+        if key in rendered_cache:
+            rendered_cache.move_to_end(key)
+            return rendered_cache[key]
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=6)
+    with rendered_cache_lock:
+        rendered_cache[key] = compressed
+        while len(rendered_cache) > RENDERED_CACHE_SIZE:
+            rendered_cache.popitem(last=False)
+    return compressed
+
+def recap_response(data, private=False):
+    """Serialize a recap with a content-derived ETag, answering 304 or a compressed body"""
+    body = dump_json_bytes(data)
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    headers = {
+        'Cache-Control': f"{'private' if private else 'public'}, max-age={RECAP_MAX_AGE}, stale-while-revalidate={result_cache.stale_ttl}",
+        'Vary': 'Accept-Encoding'
+    }
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding')) if len(body) >= COMPRESS_MIN_BYTES else None
+    etag = f'{digest}-{encoding}' if encoding else digest
+    # Echo the variant the client holds, so a cache can use the 304 to freshen it
+    for tag in (etag, digest, f'{digest}-br', f'{digest}-gzip'):
+        if request.if_none_match.contains_weak(tag):
+            headers['ETag'] = f'"{tag}"'
+            return Response(status=304, headers=headers)
+
+    if encoding:
+        body = compress_body(digest, encoding, body)
+        headers['Content-Encoding'] = encoding
+    headers['ETag'] = f'"{etag}"'
+    return Response(body, mimetype='application/json', headers=headers)
 
 @app.route('/analyze/<username>', methods=['GET'])
 @limiter.limit("30 per minute")
@@ -317,202 +2457,305 @@ def analyze_github(username):
             return jsonify({'error': 'Invalid username format'}), 400
 
         user_token = request.args.get('token')
-        headers = get_headers(user_token)
+        window = parse_window(request.args)
+        if window:
+            # Windows are aggregated from rollups, so they skip the recap cache
+            response_data = build_recap(username, user_token, window)
+        else:
+            record_lookup(username)
+            response_data = result_cache.get_or_compute(username, user_token)
+        with metrics.timer('gitrecap_stage_seconds', stage='serialization'):
+            return recap_response(response_data, private=bool(user_token))
 
-        try:
-            api_status = requests.get('https://api.github.com', headers=headers, timeout=5)
-            if api_status.status_code != 200:
-                return jsonify({'error': 'GitHub API unavailable'}), 502
-        except requests.exceptions.RequestException:
-            return jsonify({'error': 'GitHub API unavailable'}), 502
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status
+    except TimeoutError:
+        return jsonify({'error': 'Analysis timed out'}), 504
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Network error: {str(e)}")
+        return jsonify({'error': 'Network error'}), 502
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({'error': 'Server error'}), 500
 
+@app.route('/analyze/<username>/history', methods=['GET'])
+@limiter.limit("10 per minute")
+def analyze_history(username):
+    """Calendar-year activity for the last `years` years with year-over-year changes"""
+    try:
+        username = sanitize_username(username)
+        if not username:
+            return jsonify({'error': 'Invalid username format'}), 400
         try:
-            user_response = requests.get(f'https://api.github.com/users/{username}', headers=headers, timeout=10)
-            if user_response.status_code == 404:
-                return jsonify({'error': 'User not found'}), 404
-            if user_response.status_code == 403:
-                return jsonify({'error': 'GitHub API rate limit exceeded'}), 429
-            if user_response.status_code != 200:
-                return jsonify({'error': 'GitHub API error'}), user_response.status_code
-        except requests.exceptions.RequestException:
-            return jsonify({'error': 'Failed to fetch user data'}), 502
+            years = int(request.args.get('years', 3))
+        except ValueError:
+            years = 0
+        if not 1 <= years <= MAX_HISTORY_YEARS:
+            return jsonify({'error': f'years must be between 1 and {MAX_HISTORY_YEARS}'}), 400
 
-        user_data = user_response.json()
-        repos = get_all_pages(f'https://api.github.com/users/{username}/repos?per_page=100&sort=pushed', headers, max_pages=5)
-        if not repos:
-            return jsonify({'error': 'No public repositories found'}), 404
+        user_token = request.args.get('token')
+        return recap_response(build_history(username, user_token, years), private=bool(user_token))
 
-        one_year_ago = datetime.now() - timedelta(days=365)
-        language_counts = defaultdict(int)
-        days_active = set()
-        commit_time_distribution = [0] * 24
-        date_count = defaultdict(int)
-        all_commits = []
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Network error: {str(e)}")
+        return jsonify({'error': 'Network error'}), 502
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({'error': 'Server error'}), 500
 
-        # Limit to top 10 most recently pushed repos for MVP
-        repos_to_analyze = repos[:10]
-        for repo in repos_to_analyze:
-            if not repo.get('fork', False):
+def ndjson_event(section, data=None, **extra):
+    return json.dumps({'section': section, 'data': data, **extra}) + '\n'
+
+@app.route('/analyze/<username>/stream', methods=['GET'])
+@limiter.limit("30 per minute")
+def analyze_github_stream(username):
+    """NDJSON variant of /analyze: one line per recap section as soon as it is ready"""
+    username = sanitize_username(username)
+    if not username:
+        return jsonify({'error': 'Invalid username format'}), 400
+    user_token = request.args.get('token')
+    record_lookup(username)
+
+    cached = result_cache.get(username, user_token)
+    if cached is not None:
+        body = [ndjson_event('recap', cached), ndjson_event('done')]
+        return Response(body, mimetype='application/x-ndjson')
+
+    # Share the result cache's single-flight so concurrent viewers of one user cost one analysis
+    key = result_cache.make_key(username, user_token)
+    flight = result_cache.flight
+    call, leader = flight.begin(key)
+    try:
+        if not leader:
+            # The recap is already being built (streamed or not): wait for it and send it whole
+            recap = flight.wait(key, call, result_cache.flight_timeout)
+            return Response([ndjson_event('recap', recap), ndjson_event('done')], mimetype='application/x-ndjson')
+
+        sections = iter_recap(username, user_token)
+        try:
+            # Pull the first section eagerly so lookup failures still get a proper status code
+            first = next(sections)
+        except Exception as e:
+            flight.finish(key, call, error=e)
+            raise
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status
+    except TimeoutError:
+        return jsonify({'error': 'Analysis timed out'}), 504
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Network error: {str(e)}")
+        return jsonify({'error': 'Network error'}), 502
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({'error': 'Server error'}), 500
+
+    def generate():
+        response_data = {}
+        section, fragment = first
+        try:
+            while True:
+                if section != 'progress':
+                    merge_recap_section(response_data, fragment)
+                yield ndjson_event(section, fragment)
                 try:
-                    langs_response = requests.get(repo['languages_url'], headers=headers, timeout=10)
-                    if langs_response.status_code == 200:
-                        repo_langs = langs_response.json()
-                        if repo_langs:
-                            primary_lang = max(repo_langs.items(), key=lambda x: x[1])[0]
-                            language_counts[primary_lang] += 1
-                except requests.exceptions.RequestException:
-                    continue
+                    section, fragment = next(sections)
+                except StopIteration:
+                    break
+            result_cache.set(key, response_data)
+            flight.finish(key, call, result=response_data)
+            yield ndjson_event('done')
+        except AnalysisError as e:
+            flight.finish(key, call, error=e)
+            yield ndjson_event('error', error=e.message, status=e.status)
+        except Exception as e:
+            logger.exception(f"Unexpected error while streaming: {str(e)}")
+            flight.finish(key, call, error=e)
+            yield ndjson_event('error', error='Server error', status=500)
+        finally:
+            if not call['event'].is_set():
+                # The client went away mid-stream; don't leave waiters hanging
+                flight.finish(key, call, error=AnalysisError('Analysis was interrupted', 503))
 
-            try:
-                commits_url = f"{repo['url']}/commits?since={one_year_ago.isoformat()}&author={username}&per_page=100"
-                commits = get_all_pages(commits_url, headers, max_pages=3)  # Limit to 300 commits per repo max
-                all_commits.extend(commits)
-
-                for commit in commits:
-                    if isinstance(commit, dict) and 'commit' in commit:
-                        try:
-                            date = datetime.strptime(commit['commit']['author']['date'], '%Y-%m-%dT%H:%M:%SZ')
-                            days_active.add(date.date())
-                            commit_time_distribution[date.hour] += 1
-                            date_count[date.date().isoformat()] += 1
-                        except (ValueError, KeyError):
-                            continue
-            except requests.exceptions.RequestException:
-                continue
+    response = Response(generate(), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
-        weekly_commits = get_weekly_commits(all_commits, one_year_ago)
-        
-        top_languages = []
-        if language_counts:
-            top_languages = sorted([
-                {
-                    'name': lang,
-                    'count': count,
-                    'color': get_language_color(lang)
-                }
-                for lang, count in language_counts.items()
-            ], key=lambda x: -x['count'])
-            
-            top_languages = normalize_language_percentages(top_languages)
+    @response.call_on_close
+    def release():
+        # The body may never be iterated (HEAD, or a client gone before the first read)
+        sections.close()
+        if not call['event'].is_set():
+            flight.finish(key, call, error=AnalysisError('Analysis was interrupted', 503))
 
-        current_streak = max_streak = 0
-        today = datetime.now().date()
-        for i in range(365):
-            day = today - timedelta(days=i)
-            if day in days_active:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 0
+    return response
 
-        total_commits = sum(commit_time_distribution)
-        night_owl = total_commits > 0 and sum(commit_time_distribution[22:] + commit_time_distribution[:4]) > total_commits * 0.4
-        weekend_warrior = len(days_active) > 0 and sum(1 for date in days_active if date.weekday() >= 5) > len(days_active) * 0.3
-        developer_personality = "Night Owl" if night_owl else "Weekend Warrior" if weekend_warrior else "Consistent Contributor"
-
-        top_repos = sorted(
-            [repo for repo in repos if not repo.get('fork', False)],
-            key=lambda x: x.get('stargazers_count', 0),
-            reverse=True
-        )[:5]
-
-        favorite_language = top_languages[0]['name'] if top_languages else "None"
-        sentiment = analyze_commit_sentiment(all_commits)
-
-        # Calculate additional insights
-        total_repos = len([repo for repo in repos if not repo.get('fork', False)])
-        total_forks = len([repo for repo in repos if repo.get('fork', False)])
-        total_stars = sum(repo.get('stargazers_count', 0) for repo in repos)
-        total_watchers = sum(repo.get('watchers_count', 0) for repo in repos)
-        
-        # Activity patterns
-        active_hours = [i for i, count in enumerate(commit_time_distribution) if count > 0]
-        most_active_hour = max(range(24), key=lambda x: commit_time_distribution[x]) if commit_time_distribution else 0
-        total_active_days = len(days_active)
-        
-        # Repository insights
-        repo_sizes = [repo.get('size', 0) for repo in repos if not repo.get('fork', False)]
-        avg_repo_size = sum(repo_sizes) / len(repo_sizes) if repo_sizes else 0
-        
-        # Collaboration patterns
-        collaboration_score = 0
-        if total_repos > 0:
-            repos_with_contributors = sum(1 for repo in repos if repo.get('forks_count', 0) > 0)
-            collaboration_score = (repos_with_contributors / total_repos) * 100
-        
-        response_data = {
-            'profile': {
-                'username': username,
-                'avatar_url': user_data.get('avatar_url'),
-                'join_date': user_data.get('created_at', '')[:10],
-                'name': user_data.get('name'),
-                'bio': user_data.get('bio'),
-                'location': user_data.get('location'),
-                'company': user_data.get('company'),
-                'blog': user_data.get('blog'),
-                'twitter_username': user_data.get('twitter_username')
-            },
-            'stats': {
-                'repos': total_repos,
-                'forks': total_forks,
-                'stars': total_stars,
-                'watchers': total_watchers,
-                'followers': user_data.get('followers', 0),
-                'following': user_data.get('following', 0),
-                'languages': top_languages,
-                'avg_repo_size': round(avg_repo_size, 1),
-                'collaboration_score': round(collaboration_score, 1),
-                'activity': {
-                    'weekly_commits': weekly_commits,
-                    'streak': max_streak,
-                    'current_streak': current_streak,
-                    'total_active_days': total_active_days,
-                    'commit_time_distribution': commit_time_distribution,
-                    'most_active_hour': most_active_hour,
-                    'active_hours': active_hours,
-                    'contribution_data': [{'date': d, 'count': c} for d, c in date_count.items()],
-                    'top_repos': [{
-                        'name': repo['name'],
-                        'stars': repo.get('stargazers_count', 0),
-                        'forks': repo.get('forks_count', 0),
-                        'description': repo.get('description', ''),
-                        'url': repo['html_url'],
-                        'language': repo.get('language'),
-                        'size': repo.get('size', 0),
-                        'updated_at': repo.get('updated_at')
-                    } for repo in top_repos]
-                },
-                'developer_personality': developer_personality,
-                'longest_streak': max_streak,
-                'favorite_language': favorite_language,
-                'insights': {
-                    'productivity_score': round((total_active_days / 365) * 100, 1) if total_active_days > 0 else 0,
-                    'consistency_score': round((max_streak / 365) * 100, 1) if max_streak > 0 else 0,
-                    'collaboration_level': 'High' if collaboration_score > 50 else 'Medium' if collaboration_score > 20 else 'Low',
-                    'activity_pattern': 'Night Owl' if most_active_hour >= 22 or most_active_hour <= 4 else 'Early Bird' if most_active_hour <= 8 else 'Day Developer',
-                    'project_focus': 'Open Source' if total_stars > 100 else 'Personal Projects' if total_repos > 10 else 'Professional',
-                    'experience_level': 'Veteran' if total_repos > 50 else 'Experienced' if total_repos > 20 else 'Intermediate' if total_repos > 5 else 'Beginner'
-                }
-            }
-        }
+BATCH_MAX_USERS = int(os.getenv('BATCH_MAX_USERS', 25))
+batch_pool = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', 4)))
+
+def summarize_team(recaps):
+    """Aggregate per-user recaps into a team summary"""
+    weekly_commits = [0] * 52
+    commit_time_distribution = [0] * 24
+    language_counts = defaultdict(int)
+    totals = {'repos': 0, 'stars': 0, 'followers': 0, 'active_days': 0}
+    most_active = None
 
-        if sentiment:
-            response_data['sentiment'] = sentiment
+    for username, recap in recaps.items():
+        stats = recap['stats']
+        activity = stats['activity']
+        weekly_commits = [a + b for a, b in zip(weekly_commits, activity['weekly_commits'])]
+        commit_time_distribution = [a + b for a, b in zip(commit_time_distribution, activity['commit_time_distribution'])]
+        for lang in stats['languages']:
+            language_counts[lang['name']] += lang['count']
+        totals['repos'] += stats['repos']
+        totals['stars'] += stats['stars']
+        totals['followers'] += stats['followers']
+        totals['active_days'] += activity['total_active_days']
+        if most_active is None or activity['total_active_days'] > recaps[most_active]['stats']['activity']['total_active_days']:
+            most_active = username
 
-        return jsonify(response_data)
+    top_languages = normalize_language_percentages(sorted([
+        {'name': lang, 'count': count, 'color': get_language_color(lang)}
+        for lang, count in language_counts.items()
+    ], key=lambda x: -x['count']))
 
+    return {
+        'members': len(recaps),
+        'repos': totals['repos'],
+        'stars': totals['stars'],
+        'followers': totals['followers'],
+        'total_commits': sum(commit_time_distribution),
+        'weekly_commits': weekly_commits,
+        'commit_time_distribution': commit_time_distribution,
+        'languages': top_languages,
+        'favorite_language': top_languages[0]['name'] if top_languages else "None",
+        'most_active_member': most_active,
+        'average_active_days': round(totals['active_days'] / len(recaps), 1) if recaps else 0
+    }
+
+def analyze_member(username, user_token, refresh=False):
+    try:
+        if refresh:
+            return result_cache.refresh(username, user_token)
+        return result_cache.get_or_compute(username, user_token)
+    except AnalysisError as e:
+        return {'error': e.message, 'status': e.status}
+    except TimeoutError:
+        return {'error': 'Analysis timed out', 'status': 504}
     except requests.exceptions.RequestException as e:
-        print(f"Network error: {str(e)}")
-        return jsonify({'error': 'Network error'}), 502
+        logger.warning(f"Network error for {username}: {str(e)}")
+        return {'error': 'Network error', 'status': 502}
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return jsonify({'error': 'Server error'}), 500
+        logger.exception(f"Unexpected error for {username}: {str(e)}")
+        return {'error': 'Server error', 'status': 500}
+
+@app.route('/analyze/batch', methods=['POST'])
+@limiter.limit("5 per minute")
+def analyze_batch():
+    """Analyze a list of users on the shared pool and add a team summary"""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    usernames = payload.get('usernames')
+    if not isinstance(usernames, list) or not usernames:
+        return jsonify({'error': 'Expected a non-empty "usernames" list'}), 400
+    if len(usernames) > BATCH_MAX_USERS:
+        return jsonify({'error': f'At most {BATCH_MAX_USERS} usernames per batch'}), 400
+
+    members = []
+    seen = set()
+    for raw in usernames:
+        username = sanitize_username(raw) if isinstance(raw, str) else None
+        if not username:
+            return jsonify({'error': f'Invalid username format: {raw}'}), 400
+        if username.lower() not in seen:
+            seen.add(username.lower())
+            members.append(username)
+
+    user_token = payload.get('token') or request.args.get('token')
+    futures = [batch_pool.submit(contextvars.copy_context().run, analyze_member, username, user_token) for username in members]
+    results = {username: future.result() for username, future in zip(members, futures)}
+    recaps = {username: result for username, result in results.items() if 'error' not in result}
+
+    return jsonify({
+        'results': results,
+        'team': summarize_team(recaps),
+        'failed': [username for username in members if username not in recaps]
+    })
+
+@app.route('/jobs', methods=['POST'])
+@limiter.limit("30 per minute")
+def create_job():
+    """Queue an analysis; poll GET /jobs/<id> for the result"""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    username = payload.get('username')
+    username = sanitize_username(username) if isinstance(username, str) else None
+    if not username:
+        return jsonify({'error': 'Invalid username format'}), 400
+
+    record_lookup(username)
+    job = job_queue.submit(username, payload.get('token') or request.args.get('token'))
+    response = jsonify({key: job[key] for key in ('id', 'username', 'status', 'created_at')})
+    response.headers['Location'] = f"/jobs/{job['id']}"
+    return response, 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@limiter.limit("120 per minute")
+def get_job(job_id):
+    """Job status, plus the recap once it is done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@metrics.on_collect
+def collect_gauges():
+    remaining = {}
+    for bucket in quota_scheduler.snapshot():
+        if bucket['remaining'] is not None:
+            resource = bucket['resource']
+            remaining[resource] = min(remaining.get(resource, bucket['remaining']), bucket['remaining'])
+    for resource, value in remaining.items():
+        metrics.set('gitrecap_github_rate_limit_remaining', value, resource=resource)
+
+    metrics.set('gitrecap_cache_hit_ratio', result_cache.snapshot()['hit_ratio'], cache='result')
+    with metrics.lock:
+        not_modified = metrics.values.get(('gitrecap_github_not_modified_total', ()), 0)
+        gets = metrics.values.get(('gitrecap_github_requests_total', (('method', 'GET'), ('status', 200))), 0)
+        sentiment_hits = metrics.values.get(('gitrecap_sentiment_cache_lookups_total', (('result', 'hit'),)), 0)
+        sentiment_misses = metrics.values.get(('gitrecap_sentiment_cache_lookups_total', (('result', 'miss'),)), 0)
+    if not_modified + gets:
+        metrics.set('gitrecap_cache_hit_ratio', round(not_modified / (not_modified + gets), 3), cache='etag')
+    if sentiment_hits + sentiment_misses:
+        metrics.set('gitrecap_cache_hit_ratio', round(sentiment_hits / (sentiment_hits + sentiment_misses), 3), cache='sentiment')
+
+    metrics.set('gitrecap_cache_entries', len(etag_cache), cache='etag')
+    metrics.set('gitrecap_cache_entries', len(polarity_cache), cache='sentiment')
+    metrics.set('gitrecap_cache_entries', result_cache.snapshot()['local_entries'], cache='result')
+    for status, count in job_queue.snapshot()['jobs'].items():
+        metrics.set('gitrecap_jobs', count, status=status)
+    metrics.set('gitrecap_jobs', job_queue.queue.qsize(), status='backlog')
+    metrics.set('gitrecap_circuit_open', 0 if github_breaker.snapshot()['state'] == 'closed' else 1)
+
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def get_metrics():
+    """Prometheus text exposition of the stage timings, GitHub counters and cache gauges"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     host = os.getenv('HOST', '0.0.0.0')
     if os.getenv('FLASK_ENV') == 'production':
         from waitress import serve
-        serve(app, host=host, port=port, threads=4)
+        serve(create_app(), host=host, port=port, threads=4)
     else:
+        # Only the reloader's child process serves requests
+        if os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+            start_precompute()
         app.run(host=host, port=port, debug=True)
\ No newline at end of file
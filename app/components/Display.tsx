@@ -88,22 +88,83 @@ interface GitHubData {
   };
 }
 
-// Fetch data from the backend API
-async function getData(username: string): Promise<GitHubData | null> {
-  try {
-    const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:5001';
-    const response = await fetch(`${backendUrl}/analyze/${username}`);
-    
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+const EMPTY_DATA: GitHubData = {
+  profile: {
+    username: '',
+    avatar_url: '',
+    join_date: '',
+  },
+  stats: {
+    activity: {
+      weekly_commits: [],
+      streak: 0,
+      top_repos: [],
+      commit_time_distribution: [],
+      contribution_data: [],
+    },
+    languages: [],
+    repos: 0,
+    stars: 0,
+    followers: 0,
+    following: 0,
+    developer_personality: '',
+    longest_streak: 0,
+    favorite_language: '',
+  },
+};
+
+// Deep-merge a streamed section into the data received so far
+function mergeSection(target: any, fragment: any): any {
+  const merged = { ...target };
+  for (const [key, value] of Object.entries(fragment)) {
+    const current = merged[key];
+    if (value && typeof value === 'object' && !Array.isArray(value) && current && typeof current === 'object' && !Array.isArray(current)) {
+      merged[key] = mergeSection(current, value);
+    } else {
+      merged[key] = value;
+    }
+  }
+  return merged;
+}
+
+// Stream data from the backend API, reporting each section as it arrives
+async function streamData(username: string, onUpdate: (data: GitHubData) => void): Promise<GitHubData | null> {
+  const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:5001';
+  const response = await fetch(`${backendUrl}/analyze/${username}/stream`);
+
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let data: GitHubData | null = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (!line) continue;
+
+      const event = JSON.parse(line);
+      if (event.section === 'error') {
+        throw new Error(event.error || 'Failed to fetch data');
+      }
+      if (event.section === 'progress' || event.section === 'done' || !event.data) {
+        continue;
+      }
+      data = mergeSection(data || EMPTY_DATA, event.data);
+      onUpdate(data as GitHubData);
     }
-    
-    const data = await response.json();
-    return data;
-  } catch (error) {
-    console.error('Error fetching data:', error);
-    throw error;
   }
+
+  return data;
 }
 
 export default function Display({ username }: DisplayProps) {
@@ -117,11 +178,13 @@ export default function Display({ username }: DisplayProps) {
       setError(null);
       
       try {
-        const result = await getData(username);
+        const result = await streamData(username, (partial) => {
+          setData(partial);
+          setLoading(false);
+        });
         if (!result) {
           throw new Error('No data received');
         }
-        setData(result);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'Failed to fetch data');
         console.error(err);
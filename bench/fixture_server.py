@@ -0,0 +1,388 @@
+"""Local stand-in for the GitHub REST and GraphQL APIs that replays recorded fixtures.
+
+Serves the endpoints GitRecap uses (users, paginated repos, languages and
+paginated commits) with Link, ETag and rate-limit headers, and answers the
+GraphQL backend's profile and commit-history queries at /graphql from the
+same fixtures. Latency and a 403
+rate-limit scenario are configurable so benchmarks run without touching
+api.github.com.
+
+    python bench/fixture_server.py --fixtures bench/fixtures/synthetic.json --port 8765
+    python bench/fixture_server.py --record octocat --token $GITHUB_TOKEN --fixtures bench/fixtures/octocat.json
+    python bench/fixture_server.py --synthetic 5 --fixtures bench/fixtures/synthetic.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+
+REPO_URL_FIELDS = ('url', 'languages_url', 'commits_url', 'html_url')
+
+# The shapes of the two queries the GraphQL backend sends
+PROFILE_QUERY = re.compile(r'user\(login: \$login\)')
+HISTORY_FRAGMENT = re.compile(
+    r'(r\d+): repository\(owner: ("[^"]*"), name: ("[^"]*")\).*?'
+    r'history\(first: (\d+), since: ("[^"]*"), author: \{id: ("[^"]*")\}, after: (null|"[^"]*")\)',
+    re.DOTALL
+)
+
+
+def load_fixtures(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_fixtures(fixtures, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(fixtures, f)
+
+
+def record_user(username, token=None, api_url='https://api.github.com', commit_repos=10):
+    """Record the responses GitRecap needs for one user from the live API"""
+    headers = {'Accept': 'application/vnd.github.v3+json'}
+    if token:
+        headers['Authorization'] = f'token {token}'
+
+    def get_pages(url, max_pages):
+        items = []
+        while url and max_pages:
+            response = requests.get(url, headers=headers, timeout=15)
+            response.raise_for_status()
+            items.extend(response.json())
+            url = response.links.get('next', {}).get('url')
+            max_pages -= 1
+        return items
+
+    user = requests.get(f'{api_url}/users/{username}', headers=headers, timeout=15).json()
+    repos = get_pages(f'{api_url}/users/{username}/repos?per_page=100&sort=pushed', 5)
+    since = (datetime.now() - timedelta(days=365)).isoformat()
+    languages, commits = {}, {}
+    for repo in repos[:commit_repos]:
+        name = repo['full_name']
+        languages[name] = requests.get(repo['languages_url'], headers=headers, timeout=15).json()
+        try:
+            commits[name] = get_pages(f"{repo['url']}/commits?since={since}&author={username}&per_page=100", 3)
+        except requests.exceptions.HTTPError:
+            commits[name] = []
+    return {'users': {username.lower(): user}, 'repos': {username.lower(): repos}, 'languages': languages, 'commits': commits}
+
+
+def synthetic_fixtures(user_count=5, repos_per_user=30, commits_per_repo=250, seed=42, history_days=365):
+    """Deterministic fake users shaped like real GitHub responses, dated relative to now"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    messages = [
+        'Fix crash when config is missing', 'Add dark mode toggle', 'Merge pull request #12 from feature/api',
+        'Refactor parser for clarity', 'Update README with setup steps', 'Bump dependencies', 'Initial commit',
+        'Improve error messages', 'WIP', 'Implement search endpoint', 'Clean up unused imports', 'Fix typo in docs'
+    ]
+    languages = ['Python', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'Shell', 'HTML', 'CSS']
+    fixtures = {'users': {}, 'repos': {}, 'languages': {}, 'commits': {}}
+    repo_id = 1000
+
+    for u in range(user_count):
+        login = f'benchuser{u}'
+        fixtures['users'][login] = {
+            'login': login, 'id': u + 1, 'node_id': f'U_bench{u}', 'avatar_url': f'https://github.com/{login}.png', 'name': f'Bench User {u}',
+            'bio': 'Synthetic benchmark user', 'location': None, 'company': None, 'blog': '', 'twitter_username': None,
+            'created_at': '2015-03-01T12:00:00Z', 'followers': rng.randint(0, 5000), 'following': rng.randint(0, 300),
+            'public_repos': repos_per_user
+        }
+        repos = []
+        for r in range(repos_per_user):
+            repo_id += 1
+            name = f'project-{r}'
+            full_name = f'{login}/{name}'
+            pushed = now - timedelta(days=r * 3, hours=rng.randint(0, 23))
+            repos.append({
+                'id': repo_id, 'name': name, 'full_name': full_name, 'fork': r % 7 == 6,
+                'description': f'Synthetic repo {r}', 'language': rng.choice(languages),
+                'stargazers_count': rng.randint(0, 400), 'watchers_count': rng.randint(0, 400),
+                'forks_count': rng.randint(0, 50), 'size': rng.randint(10, 50000),
+                'created_at': '2016-01-01T00:00:00Z', 'updated_at': pushed.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'pushed_at': pushed.strftime('%Y-%m-%dT%H:%M:%SZ'), 'owner': {'login': login}
+            })
+            fixtures['languages'][full_name] = {
+                lang: rng.randint(100, 200000) for lang in rng.sample(languages, rng.randint(1, 4))
+            }
+            commits = []
+            for c in range(commits_per_repo if r < 10 else 0):
+                date = now - timedelta(days=rng.randint(0, history_days - 1), hours=rng.randint(0, 23), minutes=rng.randint(0, 59))
+                sha = hashlib.sha1(f'{full_name}-{c}'.encode()).hexdigest()
+                commits.append({
+                    'sha': sha, 'node_id': 'C_' + sha[:16],
+                    'commit': {
+                        'author': {'name': login, 'email': f'{login}@example.com', 'date': date.strftime('%Y-%m-%dT%H:%M:%SZ')},
+                        'committer': {'name': login, 'email': f'{login}@example.com', 'date': date.strftime('%Y-%m-%dT%H:%M:%SZ')},
+                        'message': rng.choice(messages),
+                        'tree': {'sha': sha, 'url': ''},
+                        'comment_count': 0,
+                        'verification': {'verified': False, 'reason': 'unsigned', 'signature': None, 'payload': None}
+                    },
+                    'author': {'login': login}, 'committer': {'login': login}, 'parents': [{'sha': sha}]
+                })
+            commits.sort(key=lambda commit: commit['commit']['author']['date'], reverse=True)
+            fixtures['commits'][full_name] = commits
+        fixtures['repos'][login] = repos
+    return fixtures
+
+
+class FixtureState:
+    """Replay settings and request accounting shared by handler threads"""
+
+    def __init__(self, fixtures, latency=0.0, rate_limit=5000, rate_limit_after=None):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_after = rate_limit_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.counted = 0
+        self.paths = []
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests = 0
+            self.counted = 0
+            self.paths = []
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        state = self.state
+        if state.latency:
+            time.sleep(state.latency)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [part for part in parsed.path.split('/') if part]
+        base = f'http://{self.headers.get("Host")}'
+
+        with state.lock:
+            state.requests += 1
+            state.paths.append(self.path)
+            request_number = state.requests
+        limited = state.rate_limit_after is not None and request_number > state.rate_limit_after
+
+        if limited:
+            return self.send_json(403, {'message': 'API rate limit exceeded for 127.0.0.1.'}, remaining=0)
+
+        fixtures = state.fixtures
+        if not parts:
+            return self.send_json(200, {'current_user_url': f'{base}/user'})
+        if parts[0] == 'users' and len(parts) == 2:
+            user = fixtures['users'].get(parts[1].lower())
+            return self.send_json(200, user) if user else self.send_json(404, {'message': 'Not Found'})
+        if parts[0] == 'users' and len(parts) == 3 and parts[2] == 'repos':
+            repos = [self.with_urls(repo, base) for repo in fixtures['repos'].get(parts[1].lower(), [])]
+            return self.send_page(repos, query, parsed.path, base)
+        if parts[0] == 'repos' and len(parts) == 4:
+            full_name = f'{parts[1]}/{parts[2]}'
+            if parts[3] == 'languages' and full_name in fixtures['languages']:
+                return self.send_json(200, fixtures['languages'][full_name])
+            if parts[3] == 'commits' and full_name in fixtures['commits']:
+                since = query.get('since', [''])[0][:19]
+                until = query.get('until', ['9999'])[0][:19]
+                commits = [
+                    c for c in fixtures['commits'][full_name] if since <= c['commit']['author']['date'][:19] <= until
+                ]
+                return self.send_page(commits, query, parsed.path, base)
+        return self.send_json(404, {'message': 'Not Found'})
+
+    def do_POST(self):
+        state = self.state
+        if state.latency:
+            time.sleep(state.latency)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        with state.lock:
+            state.requests += 1
+            state.paths.append(self.path)
+            request_number = state.requests
+        if state.rate_limit_after is not None and request_number > state.rate_limit_after:
+            return self.send_json(200, {'errors': [{'type': 'RATE_LIMITED', 'message': 'API rate limit exceeded'}]},
+                                  remaining=0, resource='graphql')
+        if urlparse(self.path).path.rstrip('/') != '/graphql':
+            return self.send_json(404, {'message': 'Not Found'})
+
+        query, variables = body.get('query', ''), body.get('variables') or {}
+        if PROFILE_QUERY.search(query):
+            data = {'user': self.graphql_user(variables.get('login', ''), variables.get('after'))}
+        else:
+            data = {alias: self.graphql_history(json.loads(owner), json.loads(name), int(first), json.loads(since),
+                                                json.loads(author), json.loads(after))
+                    for alias, owner, name, first, since, author, after in HISTORY_FRAGMENT.findall(query)}
+        return self.send_json(200, {'data': data}, resource='graphql')
+
+    def graphql_user(self, login, after):
+        fixtures = self.state.fixtures
+        user = fixtures['users'].get(login.lower())
+        if not user:
+            return None
+        repos = fixtures['repos'].get(login.lower(), [])
+        offset = int(after or 0)
+        page = repos[offset:offset + 100]
+        return {
+            'id': user.get('node_id'), 'login': user['login'], 'name': user.get('name'), 'bio': user.get('bio'),
+            'location': user.get('location'), 'company': user.get('company'), 'websiteUrl': user.get('blog'),
+            'twitterUsername': user.get('twitter_username'), 'avatarUrl': user.get('avatar_url'),
+            'createdAt': user.get('created_at'),
+            'followers': {'totalCount': user.get('followers', 0)},
+            'following': {'totalCount': user.get('following', 0)},
+            'repositories': {
+                'pageInfo': {'hasNextPage': offset + 100 < len(repos), 'endCursor': str(offset + len(page))},
+                'nodes': [self.graphql_repo(repo) for repo in page]
+            }
+        }
+
+    def graphql_repo(self, repo):
+        languages = self.state.fixtures['languages'].get(repo['full_name'], {})
+        return {
+            'databaseId': repo['id'], 'name': repo['name'], 'nameWithOwner': repo['full_name'], 'isFork': repo['fork'],
+            'stargazerCount': repo.get('stargazers_count', 0), 'forkCount': repo.get('forks_count', 0),
+            'diskUsage': repo.get('size', 0), 'url': repo.get('html_url') or f"https://github.com/{repo['full_name']}",
+            'description': repo.get('description'), 'updatedAt': repo.get('updated_at'), 'pushedAt': repo.get('pushed_at'),
+            'watchers': {'totalCount': repo.get('watchers_count', 0)},
+            'primaryLanguage': {'name': repo['language']} if repo.get('language') else None,
+            'languages': {'edges': [
+                {'size': size, 'node': {'name': name}}
+                for name, size in sorted(languages.items(), key=lambda item: -item[1])[:20]
+            ]}
+        }
+
+    def graphql_history(self, owner, name, first, since, author, after):
+        fixtures = self.state.fixtures
+        full_name = f'{owner}/{name}'
+        if full_name not in fixtures['commits']:
+            return None
+        logins = {login for login, user in fixtures['users'].items() if user.get('node_id') == author}
+        commits = [
+            c for c in fixtures['commits'][full_name]
+            if c['commit']['author']['date'][:19] >= since[:19]
+            and ((c.get('author') or {}).get('login') or owner).lower() in logins
+        ]
+        offset = int(after or 0)
+        page = commits[offset:offset + first]
+        return {'defaultBranchRef': {'target': {'history': {
+            'pageInfo': {'hasNextPage': offset + first < len(commits), 'endCursor': str(offset + len(page))},
+            'nodes': [
+                {'oid': c['sha'], 'authoredDate': c['commit']['author']['date'], 'message': c['commit']['message']}
+                for c in page
+            ]
+        }}}}
+
+    def with_urls(self, repo, base):
+        repo = dict(repo)
+        api_url = f"{base}/repos/{repo['full_name']}"
+        repo['url'] = api_url
+        repo['languages_url'] = f'{api_url}/languages'
+        repo['commits_url'] = f'{api_url}/commits{{/sha}}'
+        repo.setdefault('html_url', f"https://github.com/{repo['full_name']}")
+        return repo
+
+    def send_page(self, items, query, path, base):
+        per_page = int(query.get('per_page', ['30'])[0])
+        page = int(query.get('page', ['1'])[0])
+        last = max(1, -(-len(items) // per_page))
+        links = []
+
+        def page_url(number):
+            params = {key: values[0] for key, values in query.items()}
+            params['page'] = number
+            return f'<{base}{path}?{urlencode(params)}>'
+
+        if page < last:
+            links.append(f'{page_url(page + 1)}; rel="next"')
+            links.append(f'{page_url(last)}; rel="last"')
+        if page > 1:
+            links.append(f'{page_url(1)}; rel="first"')
+            links.append(f'{page_url(page - 1)}; rel="prev"')
+        self.send_json(200, items[(page - 1) * per_page:page * per_page], link=', '.join(links) or None)
+
+    def send_json(self, status, payload, link=None, remaining=None, resource='core'):
+        state = self.state
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        else:
+            with state.lock:
+                state.counted += 1
+        if remaining is None:
+            remaining = max(state.rate_limit - state.counted, 0)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Limit', str(state.rate_limit))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        self.send_header('X-RateLimit-Resource', resource)
+        if status in (200, 304):
+            self.send_header('ETag', etag)
+        if link:
+            self.send_header('Link', link)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(fixtures, host='127.0.0.1', port=0, **options):
+    """Start the fixture server on a background thread; returns (server, state, base_url)"""
+    state = FixtureState(fixtures, **options)
+    handler = type('BoundFixtureHandler', (FixtureHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='bench/fixtures/synthetic.json')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of delay added to every response')
+    parser.add_argument('--rate-limit-after', type=int, default=None, help='answer 403 rate limit after N requests')
+    parser.add_argument('--record', metavar='USERNAME', nargs='+', help='record live GitHub responses for these users')
+    parser.add_argument('--token', default=os.getenv('GITHUB_TOKEN'))
+    parser.add_argument('--synthetic', type=int, metavar='USERS', help='generate synthetic fixtures for N users')
+    args = parser.parse_args()
+
+    if args.record:
+        fixtures = {'users': {}, 'repos': {}, 'languages': {}, 'commits': {}}
+        for username in args.record:
+            for key, values in record_user(username, args.token).items():
+                fixtures[key].update(values)
+        save_fixtures(fixtures, args.fixtures)
+        print(f'Recorded {len(args.record)} users to {args.fixtures}')
+        return
+    if args.synthetic:
+        save_fixtures(synthetic_fixtures(args.synthetic), args.fixtures)
+        print(f'Wrote {args.synthetic} synthetic users to {args.fixtures}')
+        return
+
+    fixtures = load_fixtures(args.fixtures) if os.path.exists(args.fixtures) else synthetic_fixtures()
+    server, _, base_url = start_server(fixtures, port=args.port, latency=args.latency, rate_limit_after=args.rate_limit_after)
+    print(f'Serving {len(fixtures["users"])} users at {base_url} (GITHUB_API_URL={base_url})')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
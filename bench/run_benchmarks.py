@@ -0,0 +1,260 @@
+"""Reproducible GitRecap benchmarks against the local GitHub fixture server.
+
+Measures /analyze latency (cold, warm cache hit, warm recompute), GitHub calls
+per analysis, throughput under concurrent load on waitress, and
+microbenchmarks of the aggregation helpers. With --backends it also compares
+cold analyses on the REST and GraphQL fetch backends. Results are written to
+bench/results/<git sha>.json so runs can be compared across commits:
+
+    python bench/run_benchmarks.py
+    python bench/run_benchmarks.py --latency 0.05 --users 3 --compare bench/results/<old sha>.json
+    python bench/run_benchmarks.py --latency 0.05 --backends --skip-throughput
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from fixture_server import load_fixtures, start_server, synthetic_fixtures
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.mean(samples) * 1000, 2),
+        'p50_ms': round(samples[len(samples) // 2] * 1000, 2),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        'min_ms': round(samples[0] * 1000, 2)
+    }
+
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def git_sha():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_analyze(app_module, state, usernames):
+    """Cold, warm-recompute and cache-hit latency plus GitHub calls per analysis"""
+    client = app_module.app.test_client()
+    cold, recompute, hits, calls = [], [], [], {}
+
+    for username in usernames:
+        state.reset_counts()
+        start = time.perf_counter()
+        response = client.get(f'/analyze/{username}')
+        cold.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f'/analyze/{username} returned {response.status_code}: {response.get_data(as_text=True)}')
+        calls[username] = {'cold': state.requests, 'cold_counted': state.counted}
+
+        start = time.perf_counter()
+        client.get(f'/analyze/{username}')
+        hits.append(time.perf_counter() - start)
+
+        # Drop the recap but keep ETag, commit-store and sentiment caches warm
+        app_module.result_cache.invalidate(username)
+        state.reset_counts()
+        start = time.perf_counter()
+        client.get(f'/analyze/{username}')
+        recompute.append(time.perf_counter() - start)
+        calls[username].update({'warm': state.requests, 'warm_counted': state.counted})
+
+    return {
+        'cold': summarize(cold),
+        'warm_recompute': summarize(recompute),
+        'cache_hit': summarize(hits),
+        'github_calls': calls
+    }
+
+
+def bench_throughput(app_module, usernames, concurrency, duration):
+    """Requests per second from concurrent clients hitting waitress over real sockets"""
+    import requests
+    from waitress.server import create_server
+
+    server = create_server(app_module.app, host='127.0.0.1', port=0, threads=4)
+    threading.Thread(target=server.run, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.effective_port}'
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(index):
+        session = requests.Session()
+        i = index
+        while time.perf_counter() < deadline:
+            username = usernames[i % len(usernames)]
+            i += 1
+            start = time.perf_counter()
+            response = session.get(f'{base_url}/analyze/{username}', timeout=60)
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if response.status_code == 200 else errors).append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    server.close()
+
+    result = {'concurrency': concurrency, 'requests': len(latencies), 'errors': len(errors),
+              'requests_per_second': round(len(latencies) / elapsed, 2)}
+    if latencies:
+        result['latency'] = summarize(latencies)
+    return result
+
+
+def bench_micro(app_module, fixtures, repeat):
+    """Aggregation helpers on the largest fixture user's data"""
+    login = max(fixtures['commits'], key=lambda name: len(fixtures['commits'][name])).split('/')[0]
+    commits = [c for name, repo_commits in fixtures['commits'].items() if name.startswith(login + '/') for c in repo_commits]
+    messages = [c['commit']['message'] for c in commits]
+    timestamps = [app_module.parse_commit_timestamp(c['commit']['author']['date']) for c in commits]
+    one_year_ago = datetime.now() - timedelta(days=365)
+    counts = {}
+    for breakdown in fixtures['languages'].values():
+        for language, size in breakdown.items():
+            counts[language] = counts.get(language, 0) + size
+    languages = sorted([{'name': name, 'count': count, 'color': app_module.get_language_color(name)}
+                        for name, count in counts.items()], key=lambda lang: -lang['count'])
+
+    def sentiment_uncached():
+        app_module.polarity_cache.clear()
+        app_module.analyze_commit_sentiment(messages)
+
+    return {
+        'commits': len(commits),
+        'get_weekly_commits': time_call(lambda: app_module.get_weekly_commits(timestamps, one_year_ago), repeat),
+        'analyze_commit_sentiment_cold': time_call(sentiment_uncached, max(1, repeat // 10)),
+        'analyze_commit_sentiment_warm': time_call(lambda: app_module.analyze_commit_sentiment(messages), repeat),
+        'normalize_language_percentages': time_call(lambda: app_module.normalize_language_percentages(languages), repeat)
+    }
+
+
+def bench_backends(app_module, state, usernames, workdir):
+    """Cold analyses on each fetch backend: GitHub calls, latency, and whether GraphQL's recap matches REST's"""
+    client = app_module.app.test_client()
+    stores = (app_module.commit_store, app_module.rollup_store, app_module.language_cache, app_module.FETCH_BACKEND)
+    results, recaps = {}, {}
+    for backend in ('rest', 'graphql'):
+        # Start each backend cold: its own stores, no ETags, and a token of its own so no recap is shared
+        path = os.path.join(workdir, f'backend-{backend}.db')
+        app_module.commit_store = app_module.CommitStore(path)
+        app_module.rollup_store = app_module.RollupStore(path)
+        app_module.language_cache = app_module.LanguageCache(path)
+        app_module.etag_cache.clear()
+        app_module.FETCH_BACKEND = backend
+        latencies, calls = [], {}
+        for username in usernames:
+            state.reset_counts()
+            start = time.perf_counter()
+            response = client.get(f'/analyze/{username}?token=bench-{backend}')
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f'{backend} /analyze/{username} returned {response.status_code}: {response.get_data(as_text=True)}')
+            calls[username] = state.requests
+            recaps[backend, username] = response.get_json()
+        results[backend] = {'cold': summarize(latencies), 'github_calls': calls}
+    app_module.commit_store, app_module.rollup_store, app_module.language_cache, app_module.FETCH_BACKEND = stores
+
+    results['graphql']['matches_rest'] = all(recaps['graphql', username] == recaps['rest', username] for username in usernames)
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def walk(new, old, path):
+        for key, value in new.items():
+            if isinstance(value, dict) and isinstance(old.get(key), dict):
+                walk(value, old[key], path + [key])
+            elif key in ('mean_ms', 'p50_ms', 'p95_ms', 'requests_per_second') and isinstance(old.get(key), (int, float)):
+                delta = (value - old[key]) / old[key] * 100 if old[key] else 0
+                print(f"{'.'.join(path + [key]):60} {old[key]:>10} -> {value:>10} ({delta:+.1f}%)")
+
+    print(f"Comparing against {baseline.get('git_sha')} ({baseline_path})")
+    walk(current, baseline, [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='fixture file to replay (default: synthetic dataset)')
+    parser.add_argument('--users', type=int, default=5, help='number of fixture users to analyze')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every fixture response')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load for the throughput run')
+    parser.add_argument('--repeat', type=int, default=50, help='iterations per microbenchmark')
+    parser.add_argument('--skip-throughput', action='store_true')
+    parser.add_argument('--backends', action='store_true', help='also compare cold analyses on the REST and GraphQL backends')
+    parser.add_argument('--output', help='results file (default: bench/results/<git sha>.json)')
+    parser.add_argument('--compare', metavar='RESULTS', help='earlier results file to diff against')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures(args.users)
+    server, state, base_url = start_server(fixtures, latency=args.latency)
+    workdir = tempfile.mkdtemp(prefix='gitrecap-bench-')
+
+    # app reads its configuration at import time
+    os.environ['GITHUB_API_URL'] = base_url
+    os.environ['COMMIT_STORE_PATH'] = os.path.join(workdir, 'bench.db')
+    os.environ.setdefault('FETCH_BACKEND', 'rest')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['PRECOMPUTE_INTERVAL'] = '0'
+    os.environ.pop('REDIS_URL', None)
+    import app as app_module
+    app_module.limiter.enabled = False
+
+    usernames = sorted(fixtures['users'])[:args.users]
+    results = {
+        'git_sha': git_sha(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {'users': len(usernames), 'latency': args.latency, 'concurrency': args.concurrency,
+                   'duration': args.duration, 'fixtures': args.fixtures or 'synthetic'},
+        'analyze': bench_analyze(app_module, state, usernames),
+        'micro': bench_micro(app_module, fixtures, args.repeat)
+    }
+    if not args.skip_throughput:
+        results['throughput'] = bench_throughput(app_module, usernames, args.concurrency, args.duration)
+    if args.backends:
+        results['backends'] = bench_backends(app_module, state, usernames, workdir)
+    server.shutdown()
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{results['git_sha']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f'Results written to {output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# app reads its configuration at import time
+os.environ.setdefault('COMMIT_STORE_PATH', os.path.join(tempfile.mkdtemp(prefix='gitrecap-tests-'), 'test.db'))
+os.environ.setdefault('PRECOMPUTE_INTERVAL', '0')
+os.environ.pop('REDIS_URL', None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
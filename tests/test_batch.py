@@ -0,0 +1,21 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app.limiter, 'enabled', False)
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('body', [['alice'], 'alice', 3])
+def test_non_object_body_is_rejected(client, body):
+    response = client.post('/analyze/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Expected a JSON object'}
+
+
+def test_missing_usernames_is_rejected(client):
+    response = client.post('/analyze/batch', json={'usernames': []})
+    assert response.status_code == 400
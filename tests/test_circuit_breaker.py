@@ -0,0 +1,120 @@
+import pytest
+import requests
+
+import app
+from app import CircuitBreaker, CircuitOpen, QuotaExhausted, QuotaScheduler
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'open'
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'closed'
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'open'
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'closed'
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    open_breaker(breaker)
+    breaker.before_call()
+    assert breaker.snapshot()['state'] == 'half_open'
+    # Only one probe at a time
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.snapshot()['state'] == 'closed'
+    breaker.before_call()
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    open_breaker(breaker)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'open'
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ChunkedEncodingError('truncated'),
+    requests.exceptions.ContentDecodingError('bad gzip'),
+    requests.exceptions.TooManyRedirects('loop'),
+    ValueError('not a network error')
+])
+def test_failed_probe_never_leaves_breaker_stuck(monkeypatch, error):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr(app, 'github_breaker', breaker)
+
+    def fail(*args, **kwargs):
+        raise error
+    monkeypatch.setattr(app.github_session, 'request', fail)
+
+    open_breaker(breaker)
+    with pytest.raises(type(error)):
+        app.send_github_request('GET', 'https://example.invalid/probe', {})
+    assert not breaker.probing
+    # The next call after the reset timeout is allowed through as a new probe
+    breaker.before_call()
+
+
+@pytest.fixture
+def small_bucket(monkeypatch):
+    """A fresh breaker and a scheduler whose bucket for the probe URL has 5 of 60 calls left"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    scheduler = QuotaScheduler()
+    key = app.quota_key('https://example.invalid/probe', {})
+    scheduler.buckets[key] = {'remaining': 5, 'limit': 60, 'reset': 0, 'blocked_until': 0}
+    monkeypatch.setattr(app, 'github_breaker', breaker)
+    monkeypatch.setattr(app, 'quota_scheduler', scheduler)
+    return breaker, scheduler.buckets[key]
+
+
+def test_open_circuit_fast_fails_spend_no_quota(small_bucket):
+    breaker, bucket = small_bucket
+    open_breaker(breaker)
+    for _ in range(20):
+        with pytest.raises(CircuitOpen):
+            app.send_github_request('GET', 'https://example.invalid/probe', {})
+    assert bucket['remaining'] == 5
+
+
+@pytest.mark.parametrize('error', [requests.exceptions.Timeout('slow'), requests.exceptions.ConnectionError('refused')])
+def test_transport_failures_give_their_quota_back(monkeypatch, small_bucket, error):
+    _, bucket = small_bucket
+
+    def fail(*args, **kwargs):
+        raise error
+    monkeypatch.setattr(app.github_session, 'request', fail)
+
+    with pytest.raises(type(error)):
+        app.send_github_request('GET', 'https://example.invalid/probe', {})
+    assert bucket['remaining'] == 5
+
+
+def test_probe_refused_by_quota_is_released(small_bucket):
+    breaker, bucket = small_bucket
+    open_breaker(breaker)
+    breaker.reset_timeout = 0
+    bucket['remaining'] = 0
+    with pytest.raises(QuotaExhausted):
+        app.send_github_request('GET', 'https://example.invalid/probe', {})
+    assert breaker.snapshot()['state'] == 'half_open'
+    assert not breaker.probing
@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench'))
+from fixture_server import start_server, synthetic_fixtures
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    """Point the app at a fixture server with one user whose repos and histories span several GraphQL pages"""
+    fixtures = synthetic_fixtures(1, repos_per_user=520, commits_per_repo=400)
+    server, state, base_url = start_server(fixtures)
+    monkeypatch.setattr(app, 'GITHUB_API_URL', base_url)
+    monkeypatch.setattr(app, 'GITHUB_GRAPHQL_URL', f'{base_url}/graphql')
+    path = str(tmp_path / 'graphql.db')
+    monkeypatch.setattr(app, 'commit_store', app.CommitStore(path))
+    monkeypatch.setattr(app, 'rollup_store', app.RollupStore(path))
+    monkeypatch.setattr(app, 'language_cache', app.LanguageCache(path))
+    yield fixtures, state
+    server.shutdown()
+
+
+def crawl(username, headers, one_year_ago):
+    user_data, repos = app.fetch_graphql_profile(username, headers)
+    top = [repo for repo in repos if not repo.fork][:3]
+    results = dict(app.iter_graphql_repo_results(username, headers, top, user_data, one_year_ago))
+    return repos, top, results
+
+
+def test_graphql_pages_repos_and_histories_up_to_the_rest_caps(github):
+    fixtures, state = github
+    one_year_ago = datetime.now() - timedelta(days=365)
+    repos, top, results = crawl('benchuser0', app.get_headers('token'), one_year_ago)
+
+    assert len(repos) == 100 * app.MAX_REPO_PAGES
+    assert [repo.full_name for repo in repos] == [repo['full_name'] for repo in fixtures['repos']['benchuser0'][:500]]
+    for index, repo in enumerate(top):
+        assert len(results[index][1]) == 100 * app.MAX_COMMIT_PAGES
+    # One query per page of repos, then one batched query per page of history
+    assert state.requests == app.MAX_REPO_PAGES + app.MAX_COMMIT_PAGES
+    assert all(app.commit_store.get_sync_state('benchuser0', repo.full_name) for repo in top)
+
+
+def test_failed_history_page_keeps_commits_without_completing_the_sync(github, monkeypatch):
+    _, state = github
+    graphql = app.github_graphql
+    queries = []
+
+    def failing_second_history_page(query, headers, variables=None):
+        if 'history(' in query:
+            queries.append(query)
+            if len(queries) == 2:
+                raise app.AnalysisError('GitHub API error', 502)
+        return graphql(query, headers, variables)
+
+    monkeypatch.setattr(app, 'github_graphql', failing_second_history_page)
+    one_year_ago = datetime.now() - timedelta(days=365)
+    _, top, results = crawl('benchuser0', app.get_headers('token'), one_year_ago)
+
+    assert len(queries) == 2
+    for index, repo in enumerate(top):
+        assert len(results[index][1]) == 100
+        assert app.commit_store.get_sync_state('benchuser0', repo.full_name) is None
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app
+from app import JobQueue, MemoryStore, ResultCache, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+def wait_for(job_queue, job, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        current = job_queue.get(job['id'])
+        if current['status'] not in ('queued', 'running'):
+            return current
+        time.sleep(0.01)
+    raise AssertionError(f"job {job['id']} did not finish")
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Replace the analysis with one that records the priority each job ran at"""
+    seen = []
+
+    def analyze_member(username, user_token, refresh=False):
+        seen.append((username, app.request_priority.get()))
+        return {'profile': {'username': username}}
+
+    monkeypatch.setattr(app, 'analyze_member', analyze_member)
+    return seen
+
+
+def test_api_jobs_run_interactive_and_precompute_jobs_run_background(recorded):
+    jobs = JobQueue(workers=1)
+    api = jobs.submit('alice')
+    precompute = jobs.submit('bob', refresh=True, source='precompute', priority=PRIORITY_BACKGROUND)
+
+    assert wait_for(jobs, api)['status'] == 'done'
+    assert wait_for(jobs, precompute)['status'] == 'done'
+    assert dict(recorded) == {'alice': PRIORITY_INTERACTIVE, 'bob': PRIORITY_BACKGROUND}
+
+
+def test_interactive_jobs_are_picked_before_queued_background_work(monkeypatch, recorded):
+    release = threading.Event()
+    analyze = app.analyze_member
+
+    def blocking(username, user_token, refresh=False):
+        if username == 'first':
+            release.wait(5)
+        return analyze(username, user_token, refresh)
+
+    monkeypatch.setattr(app, 'analyze_member', blocking)
+    jobs = JobQueue(workers=1)
+    first = jobs.submit('first', source='precompute', priority=PRIORITY_BACKGROUND)
+    while jobs.get(first['id'])['status'] == 'queued':
+        time.sleep(0.01)
+    background = [jobs.submit(f'bg{i}', source='precompute', priority=PRIORITY_BACKGROUND) for i in range(3)]
+    api = jobs.submit('alice')
+    release.set()
+
+    for job in background + [api]:
+        wait_for(jobs, job)
+    assert [username for username, _ in recorded] == ['first', 'alice', 'bg0', 'bg1', 'bg2']
+
+
+def test_precompute_skips_users_with_fresh_recaps(monkeypatch):
+    cache = ResultCache(lambda username, user_token=None: {'profile': {'username': username}}, MemoryStore(), ttl=60)
+    cache.get_or_compute('fresh')
+    cache.get_or_compute('stale')
+    key = cache.make_key('stale', None)
+    entry = dict(cache.local[key], stored_at=cache.local[key]['stored_at'] - 120)
+    cache.local[key] = entry
+    cache.store.set(key, json.dumps(entry))
+    submitted = []
+
+    class StopRound(Exception):
+        pass
+
+    def sleep(seconds):
+        raise StopRound
+
+    monkeypatch.setattr(app, 'result_cache', cache)
+    monkeypatch.setattr(app, 'precompute_targets', lambda: ['fresh', 'stale', 'missing'])
+    monkeypatch.setattr(app.job_queue, 'submit', lambda username, **kwargs: submitted.append((username, kwargs['priority'])))
+    monkeypatch.setattr(app.time, 'sleep', sleep)
+
+    with pytest.raises(StopRound):
+        app.precompute_recaps()
+    assert submitted == [('stale', PRIORITY_BACKGROUND), ('missing', PRIORITY_BACKGROUND)]
+
+
+def test_importing_the_app_does_not_start_precompute():
+    assert not app.precompute_started
+    assert not any(thread.name == 'gitrecap-precompute' for thread in threading.enumerate())
+
+
+def test_api_submit_takes_over_a_queued_precompute_job(monkeypatch, recorded):
+    release = threading.Event()
+    analyze = app.analyze_member
+
+    def blocking(username, user_token, refresh=False):
+        if username == 'first':
+            release.wait(5)
+        return analyze(username, user_token, refresh)
+
+    monkeypatch.setattr(app, 'analyze_member', blocking)
+    jobs = JobQueue(workers=1)
+    first = jobs.submit('first', source='precompute', priority=PRIORITY_BACKGROUND)
+    while jobs.get(first['id'])['status'] == 'queued':
+        time.sleep(0.01)
+    background = [jobs.submit(f'bg{i}', source='precompute', priority=PRIORITY_BACKGROUND) for i in range(2)]
+    trending = jobs.submit('trending', source='precompute', priority=PRIORITY_BACKGROUND)
+    api = jobs.submit('trending')
+    assert api['id'] == trending['id']
+    assert (api['source'], api['priority']) == ('api', PRIORITY_INTERACTIVE)
+    release.set()
+
+    for job in background + [api]:
+        wait_for(jobs, job)
+    assert recorded == [('first', PRIORITY_BACKGROUND), ('trending', PRIORITY_INTERACTIVE),
+                        ('bg0', PRIORITY_BACKGROUND), ('bg1', PRIORITY_BACKGROUND)]
+    assert jobs.get(api['id'])['result'] == {'profile': {'username': 'trending'}}
+
+
+def test_finished_precompute_jobs_do_not_keep_recaps(recorded):
+    jobs = JobQueue(workers=1)
+    job = wait_for(jobs, jobs.submit('bob', refresh=True, source='precompute', priority=PRIORITY_BACKGROUND))
+    assert job['status'] == 'done'
+    assert 'result' not in job
+
+
+@pytest.mark.parametrize('body', [['alice'], 'alice'])
+def test_create_job_rejects_non_object_body(monkeypatch, body):
+    monkeypatch.setattr(app.limiter, 'enabled', False)
+    response = app.app.test_client().post('/jobs', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Expected a JSON object'}
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+import app
+from app import PAGES_COMPLETE, PAGES_FAILED, PAGES_TRUNCATED
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench'))
+from fixture_server import start_server, synthetic_fixtures
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """Parallel pagination against a fixture user with 7 pages of 100 repos"""
+    fixtures = synthetic_fixtures(1, repos_per_user=650, commits_per_repo=0)
+    server, state, base_url = start_server(fixtures)
+    monkeypatch.setattr(app, 'PARALLEL_PAGINATION', True)
+    monkeypatch.setattr(app, 'etag_cache', type(app.etag_cache)())
+    built = []
+    remaining_page_urls = app.remaining_page_urls
+
+    def recording(response, max_pages):
+        urls, truncated = remaining_page_urls(response, max_pages)
+        built.append((urls, truncated))
+        return urls, truncated
+
+    monkeypatch.setattr(app, 'remaining_page_urls', recording)
+    state.built = built
+    yield fixtures, state, base_url
+    server.shutdown()
+
+
+def crawl(base_url, max_pages):
+    return app.fetch_all_pages(f'{base_url}/users/benchuser0/repos?per_page=100&sort=pushed', {}, max_pages,
+                               lambda repo: repo['name'])
+
+
+def requested_pages(state):
+    return sorted(int(dict(part.split('=') for part in path.split('?')[1].split('&')).get('page', 1))
+                  for path in state.paths)
+
+
+def test_pages_from_the_last_link_come_back_in_order(github):
+    fixtures, state, base_url = github
+    names, status = crawl(base_url, max_pages=10)
+
+    assert status == PAGES_COMPLETE
+    assert names == [repo['name'] for repo in fixtures['repos']['benchuser0']]
+    assert requested_pages(state) == [1, 2, 3, 4, 5, 6, 7]
+    # Pages 2..7 were rebuilt from the first page's rel="last" link, keeping the query
+    (urls, truncated), = state.built
+    assert not truncated
+    assert urls == [f'{base_url}/users/benchuser0/repos?per_page=100&sort=pushed&page={page}' for page in range(2, 8)]
+
+
+def test_crawl_stops_at_max_pages(github):
+    fixtures, state, base_url = github
+    names, status = crawl(base_url, max_pages=3)
+
+    assert status == PAGES_TRUNCATED
+    assert names == [repo['name'] for repo in fixtures['repos']['benchuser0'][:300]]
+    assert requested_pages(state) == [1, 2, 3]
+    assert [len(urls) for urls, _ in state.built] == [2] and state.built[0][1]
+
+
+def test_crawl_keeps_pages_before_the_first_failure(github, monkeypatch):
+    fixtures, _, base_url = github
+    fetch_page = app.fetch_page
+
+    def failing_page_four(url, headers, project=None):
+        if 'page=4' in url:
+            return None, None
+        return fetch_page(url, headers, project)
+
+    monkeypatch.setattr(app, 'fetch_page', failing_page_four)
+    names, status = crawl(base_url, max_pages=10)
+
+    assert status == PAGES_FAILED
+    assert names == [repo['name'] for repo in fixtures['repos']['benchuser0'][:300]]
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from app import QuotaExhausted, QuotaScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+KEY = ('token-hash', 'core')
+
+
+class Response:
+    def __init__(self, status_code=200, **headers):
+        self.status_code = status_code
+        self.headers = {name.replace('_', '-'): str(value) for name, value in headers.items()}
+
+
+def scheduler_with(remaining, limit, **options):
+    scheduler = QuotaScheduler(**options)
+    scheduler.record(KEY, Response(**{
+        'X_RateLimit_Remaining': remaining, 'X_RateLimit_Limit': limit, 'X_RateLimit_Reset': int(time.time()) + 3600
+    }))
+    return scheduler
+
+
+def remaining(scheduler):
+    return scheduler.snapshot()[0]['remaining']
+
+
+def test_unknown_bucket_lets_calls_through():
+    scheduler = QuotaScheduler()
+    for _ in range(3):
+        scheduler.acquire(KEY, PRIORITY_BACKGROUND)
+    assert scheduler.snapshot()[0]['remaining'] is None
+
+
+def test_acquire_reserves_a_unit_and_record_corrects_it():
+    scheduler = scheduler_with(10, 5000)
+    scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+    scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+    assert remaining(scheduler) == 8
+    scheduler.record(KEY, Response(X_RateLimit_Remaining=9))
+    assert remaining(scheduler) == 9
+
+
+def test_interactive_calls_spend_down_to_zero():
+    scheduler = scheduler_with(2, 5000)
+    scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+    scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+    with pytest.raises(QuotaExhausted):
+        scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+
+
+@pytest.mark.parametrize('limit, remaining_calls, allowed', [
+    (5000, 501, True), (5000, 500, False),  # the fixed reserve
+    (1000, 101, True), (1000, 100, False),  # a tenth of a smaller limit
+    (60, 51, True), (60, 50, False)         # never below the floor on the unauthenticated bucket
+])
+def test_background_reserve(limit, remaining_calls, allowed):
+    scheduler = scheduler_with(remaining_calls, limit)
+    if allowed:
+        scheduler.acquire(KEY, PRIORITY_BACKGROUND)
+    else:
+        with pytest.raises(QuotaExhausted):
+            scheduler.acquire(KEY, PRIORITY_BACKGROUND)
+        scheduler.acquire(KEY, PRIORITY_INTERACTIVE)
+
+
+def test_release_gives_a_unit_back_up_to_the_limit():
+    scheduler = scheduler_with(59, 60)
+    scheduler.acquire(KEY)
+    scheduler.release(KEY)
+    scheduler.release(KEY)
+    scheduler.release(KEY)
+    assert remaining(scheduler) == 60
+
+
+def test_retry_after_blocks_every_priority():
+    scheduler = scheduler_with(4000, 5000)
+    scheduler.record(KEY, Response(403, Retry_After=60))
+    for priority in (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND):
+        with pytest.raises(QuotaExhausted, match='back off'):
+            scheduler.acquire(KEY, priority)
+
+
+def test_retry_after_on_success_is_ignored():
+    scheduler = scheduler_with(4000, 5000)
+    scheduler.record(KEY, Response(200, Retry_After=60))
+    scheduler.acquire(KEY)
+
+
+def test_bucket_resets_after_reset_time():
+    scheduler = QuotaScheduler()
+    scheduler.record(KEY, Response(X_RateLimit_Remaining=0, X_RateLimit_Limit=60, X_RateLimit_Reset=int(time.time()) - 1))
+    scheduler.acquire(KEY)
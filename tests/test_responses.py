@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+
+import app
+from app import negotiate_encoding
+
+RECAP = {'profile': {'username': 'alice', 'bio': 'Développeuse — café ☕'}, 'stats': {'repos': list(range(500))}}
+
+
+@pytest.mark.parametrize('header, encoding', [
+    (None, None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('*', 'br'),
+    ('*, br;q=0', 'gzip'),
+    ('gzip;q=bogus', None)
+])
+def test_negotiate_encoding(header, encoding):
+    assert negotiate_encoding(header) == encoding
+
+
+def respond(**headers):
+    with app.app.test_request_context('/analyze/alice', headers=headers):
+        return app.recap_response(RECAP)
+
+
+def test_compressed_variant_has_its_own_etag():
+    plain = respond()
+    compressed = respond(**{'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert json.loads(gzip.decompress(compressed.get_data())) == json.loads(plain.get_data())
+
+
+@pytest.mark.parametrize('encoding', [None, 'gzip', 'br'])
+def test_not_modified_echoes_the_variant_the_client_holds(encoding):
+    accept = {'Accept-Encoding': encoding} if encoding else {}
+    etag = respond(**accept).headers['ETag']
+
+    response = respond(**{'If-None-Match': etag, **accept})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.get_data() == b''
+
+
+def test_not_modified_for_a_variant_stored_under_another_encoding():
+    etag = respond(**{'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = respond(**{'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+
+def test_changed_recap_is_sent_in_full():
+    response = respond(**{'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == RECAP
+
+
+def test_fast_serializer_produces_the_same_document_as_the_stdlib():
+    # orjson keeps non-ASCII as UTF-8 where json escapes it, so compare parsed documents
+    assert json.loads(app.dump_json_bytes(RECAP)) == json.loads(json.dumps(RECAP, sort_keys=True))
+    assert list(json.loads(app.dump_json_bytes({'b': 1, 'a': 2}))) == ['a', 'b']
@@ -0,0 +1,121 @@
+import json
+import time
+
+from app import MemoryStore, ResultCache
+
+
+class Recaps:
+    """Counting stand-in for build_recap"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, username, user_token=None):
+        self.calls += 1
+        return {'user': username, 'version': self.calls}
+
+
+def make_cache(store=None, **options):
+    recaps = Recaps()
+    options.setdefault('ttl', 60)
+    options.setdefault('stale_ttl', 600)
+    return ResultCache(recaps, store or MemoryStore(), **options), recaps
+
+
+def age(cache, key, seconds):
+    """Backdate an entry in both tiers"""
+    entry = dict(cache.local[key])
+    entry['stored_at'] -= seconds
+    cache.local[key] = entry
+    cache.store.set(key, json.dumps(entry))
+
+
+def wait_for_refresh(cache, timeout=5):
+    deadline = time.time() + timeout
+    while cache.refreshing and time.time() < deadline:
+        time.sleep(0.01)
+    assert not cache.refreshing
+
+
+def test_miss_computes_then_fresh_hits_are_local():
+    cache, recaps = make_cache()
+    assert cache.get('alice') is None
+    assert cache.get_or_compute('alice') == {'user': 'alice', 'version': 1}
+    assert cache.get_or_compute('Alice') == {'user': 'alice', 'version': 1}
+    assert recaps.calls == 1
+    stats = cache.snapshot()
+    assert stats['misses'] == 2
+    assert stats['local_hits'] == 1
+    assert stats['stale_hits'] == 0
+
+
+def test_shared_tier_serves_other_instances():
+    store = MemoryStore()
+    first, _ = make_cache(store)
+    second, recaps = make_cache(store)
+    first.get_or_compute('alice')
+    assert second.get_or_compute('alice')['version'] == 1
+    assert recaps.calls == 0
+    assert second.snapshot()['shared_hits'] == 1
+
+
+def test_token_scopes_entries():
+    cache, recaps = make_cache()
+    cache.get_or_compute('alice')
+    cache.get_or_compute('alice', 'secret-token')
+    assert recaps.calls == 2
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    cache, recaps = make_cache()
+    cache.get_or_compute('alice')
+    age(cache, cache.make_key('alice'), 120)
+
+    assert cache.get('alice')['version'] == 1
+    wait_for_refresh(cache)
+    assert recaps.calls == 2
+    assert cache.get('alice')['version'] == 2
+    stats = cache.snapshot()
+    assert stats['stale_hits'] == 1
+    assert stats['refreshes'] == 1
+    assert stats['local_hits'] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache, recaps = make_cache()
+    cache.get_or_compute('alice')
+    age(cache, cache.make_key('alice'), 60 + 600 + 1)
+    assert cache.get('alice') is None
+    assert cache.get_or_compute('alice')['version'] == 2
+    assert recaps.calls == 2
+
+
+def test_invalidate_drops_both_tiers():
+    cache, recaps = make_cache()
+    cache.get_or_compute('alice')
+    cache.invalidate('alice')
+    key = cache.make_key('alice')
+    assert key not in cache.local
+    assert cache.store.get(key) is None
+    assert cache.get_or_compute('alice')['version'] == 2
+
+
+def test_local_tier_is_bounded():
+    cache, _ = make_cache(max_local=2)
+    for username in ('a', 'b', 'c'):
+        cache.get_or_compute(username)
+    assert list(cache.local) == [cache.make_key('b'), cache.make_key('c')]
+
+
+def test_store_errors_fall_back_to_computing():
+    class BrokenStore(MemoryStore):
+        def get(self, key):
+            raise ConnectionError('redis down')
+
+        def set(self, key, value, ex=None):
+            raise ConnectionError('redis down')
+
+    cache, recaps = make_cache(BrokenStore())
+    assert cache.get_or_compute('alice')['version'] == 1
+    assert cache.get_or_compute('alice')['version'] == 1
+    assert cache.snapshot()['errors'] >= 2
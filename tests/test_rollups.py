@@ -0,0 +1,116 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+import app
+from app import CommitRecord, RepoRecord, RollupStore, PAGES_COMPLETE, PAGES_FAILED, PAGES_TRUNCATED
+
+
+def dirty_rows(store):
+    return store.conn.execute("SELECT username, repo, first_day, last_day FROM rollup_dirty ORDER BY repo").fetchall()
+
+
+def test_mark_dirty_keeps_one_widening_range_per_repo(tmp_path):
+    store = RollupStore(str(tmp_path / 'rollups.db'))
+    for first_day, last_day in [('2024-03-01', '2024-03-05'), ('2024-02-10', '2024-03-02'), ('2024-03-04', '2024-04-01')]:
+        store.mark_dirty('Alice', 'alice/repo', first_day, last_day)
+    store.mark_dirty('alice', 'alice/other', '2024-01-01', '2024-01-01')
+
+    assert dirty_rows(store) == [
+        ('alice', 'alice/other', '2024-01-01', '2024-01-01'),
+        ('alice', 'alice/repo', '2024-02-10', '2024-04-01')
+    ]
+
+
+def test_flush_rebuilds_each_dirty_range_once(tmp_path, monkeypatch):
+    store = RollupStore(str(tmp_path / 'rollups.db'))
+    rebuilt = []
+    monkeypatch.setattr(store, 'rebuild', lambda *args: rebuilt.append(args))
+    store.mark_dirty('alice', 'alice/repo', '2024-03-01', '2024-03-05')
+    store.mark_dirty('alice', 'alice/repo', '2024-01-01', '2024-01-02')
+
+    store.flush('alice')
+    store.flush('alice')
+    assert rebuilt == [('alice', 'alice/repo', '2024-01-01', '2024-03-05')]
+    assert dirty_rows(store) == []
+
+
+def test_per_sync_dirty_rows_from_older_stores_are_folded(tmp_path):
+    path = str(tmp_path / 'rollups.db')
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE rollup_dirty (username TEXT, repo TEXT, first_day TEXT, last_day TEXT)")
+        conn.executemany("INSERT INTO rollup_dirty VALUES (?, ?, ?, ?)", [
+            ('alice', 'alice/repo', '2024-03-01', '2024-03-05'),
+            ('alice', 'alice/repo', '2024-02-01', '2024-03-01')
+        ])
+    conn.close()
+
+    store = RollupStore(path)
+    store.mark_dirty('alice', 'alice/repo', '2024-03-10', '2024-03-10')
+    assert dirty_rows(store) == [('alice', 'alice/repo', '2024-02-01', '2024-03-10')]
+
+
+@pytest.mark.parametrize('pages, status', [(5, PAGES_COMPLETE), (3, PAGES_COMPLETE), (2, PAGES_TRUNCATED)])
+def test_fetch_all_pages_reports_truncation(monkeypatch, pages, status):
+    class Response:
+        def __init__(self, page):
+            self.links = {'next': {'url': f'page{page + 1}'}} if page < 3 else {}
+
+    monkeypatch.setattr(app, 'PARALLEL_PAGINATION', False)
+    monkeypatch.setattr(app, 'fetch_page', lambda url, headers, project=None: ([url], Response(int(url[4:]))))
+    items, result = app.fetch_all_pages('page1', {}, max_pages=pages)
+    assert result == status
+    assert items == [f'page{n}' for n in range(1, min(pages, 3) + 1)]
+
+
+@pytest.fixture
+def backfill(monkeypatch, tmp_path):
+    """A repo whose history is one commit a day through 2023, served newest first in capped crawls"""
+    history = [CommitRecord(f'sha{n}', f'2023-{month:02d}-{day:02d}T12:00:00Z', 'work')
+               for n, (month, day) in enumerate((m, d) for m in range(1, 13) for d in range(1, 29))]
+    history.sort(key=lambda commit: commit.date, reverse=True)
+    crawls = []
+    outcome = {'fail_after': None}
+
+    def get_all_pages(url, headers, max_pages=10, with_status=False, project=None):
+        until = url.split('until=')[1].split('&')[0]
+        crawls.append(until)
+        if outcome['fail_after'] is not None and len(crawls) > outcome['fail_after']:
+            return [], PAGES_FAILED
+        matching = [commit for commit in history if commit.date <= until]
+        return matching[:100], PAGES_TRUNCATED if len(matching) > 100 else PAGES_COMPLETE
+
+    monkeypatch.setattr(app, 'get_all_pages', get_all_pages)
+    monkeypatch.setattr(app, 'commit_store', app.CommitStore(str(tmp_path / 'commits.db')))
+    monkeypatch.setattr(app, 'rollup_store', RollupStore(str(tmp_path / 'commits.db')))
+    repo = RepoRecord(name='repo', full_name='alice/repo', url='https://api.example/repos/alice/repo',
+                      pushed_at='2024-06-01T00:00:00Z')
+    return repo, history, crawls, outcome
+
+
+def sync_2023(repo):
+    app.sync_repo_window(repo, 'alice', {}, [(date(2023, 1, 1), date(2023, 12, 31))], datetime(2024, 6, 1))
+
+
+def test_truncated_backfill_keeps_crawling_before_the_oldest_commit(backfill):
+    repo, history, crawls, _ = backfill
+    sync_2023(repo)
+
+    assert len(crawls) == 4
+    stored = app.commit_store.load_day_range('alice', 'alice/repo', '2023-01-01', '2023-12-31')
+    assert len(stored) == len(history)
+    assert app.rollup_store.uncovered_start('alice', 'alice/repo', date(2023, 1, 1), date(2023, 12, 31)) is None
+
+    sync_2023(repo)
+    assert len(crawls) == 4
+
+
+def test_failed_backfill_leaves_the_range_uncovered(backfill):
+    repo, _, crawls, outcome = backfill
+    outcome['fail_after'] = 1
+    sync_2023(repo)
+
+    assert len(crawls) == 2
+    assert app.rollup_store.uncovered_start('alice', 'alice/repo', date(2023, 1, 1), date(2023, 12, 31)) == date(2023, 1, 1)
@@ -0,0 +1,80 @@
+import re
+from collections import defaultdict
+
+import pytest
+from textblob import TextBlob
+
+import app
+
+MESSAGES = [
+    'Fix crash when config is missing', 'Add dark mode toggle', 'Merge pull request #12 from feature/api',
+    'Refactor parser for clarity', 'Update README with setup steps', 'Bump dependencies', 'Initial commit',
+    'Improve error messages', 'WIP', 'Implement search endpoint', 'Clean up unused imports', 'Fix typo in docs',
+    'Great improvement to the terrible, awful build', 'Café menu: añadir soporte', '', 'fix fix fix', 'Revert "Add dark mode toggle"'
+] * 3
+
+
+def per_message_sentiment(messages):
+    """The pre-memoization implementation: one TextBlob per message, in order"""
+    analysis = {
+        'positive': 0, 'neutral': 0, 'negative': 0, 'average_polarity': 0, 'common_words': {},
+        'commit_types': {'feature': 0, 'bugfix': 0, 'refactor': 0, 'docs': 0, 'chore': 0, 'other': 0}
+    }
+    word_counts = defaultdict(int)
+    stop_words = {"the", "and", "a", "an", "in", "on", "at", "to", "of", "for"}
+    for message in messages:
+        polarity = TextBlob(message).sentiment.polarity
+        analysis['average_polarity'] += polarity
+        if polarity > 0.2:
+            analysis['positive'] += 1
+        elif polarity < -0.2:
+            analysis['negative'] += 1
+        else:
+            analysis['neutral'] += 1
+        msg_lower = message.lower()
+        if any(word in msg_lower for word in ['fix', 'bug', 'error', 'issue']):
+            analysis['commit_types']['bugfix'] += 1
+        elif any(word in msg_lower for word in ['add', 'implement', 'feature', 'feat']):
+            analysis['commit_types']['feature'] += 1
+        elif any(word in msg_lower for word in ['refactor', 'clean', 'optimize', 'improve']):
+            analysis['commit_types']['refactor'] += 1
+        elif any(word in msg_lower for word in ['doc', 'readme', 'comment', 'wiki']):
+            analysis['commit_types']['docs'] += 1
+        elif any(word in msg_lower for word in ['chore', 'update', 'bump', 'merge']):
+            analysis['commit_types']['chore'] += 1
+        else:
+            analysis['commit_types']['other'] += 1
+        for word in re.findall(r'\b\w+\b', msg_lower):
+            if word not in stop_words and len(word) > 3 and word.isalpha():
+                word_counts[word] += 1
+    analysis['average_polarity'] = round(analysis['average_polarity'] / len(messages), 2)
+    analysis['common_words'] = dict(sorted(word_counts.items(), key=lambda x: -x[1])[:10])
+    return analysis
+
+
+@pytest.fixture(params=[0, 2], ids=['inline', 'worker-processes'])
+def scoring(request, monkeypatch):
+    monkeypatch.setattr(app, 'SENTIMENT_WORKERS', request.param)
+    monkeypatch.setattr(app, 'SENTIMENT_BATCH_SIZE', 4)
+    monkeypatch.setattr(app, 'sentiment_pool', None)
+    app.polarity_cache.clear()
+    yield
+    if app.sentiment_pool is not None:
+        app.sentiment_pool.shutdown()
+    app.polarity_cache.clear()
+
+
+def test_batched_polarities_match_per_message_scores(scoring):
+    expected = [TextBlob(message).sentiment.polarity for message in MESSAGES]
+    assert app.get_polarities(MESSAGES) == expected
+    if app.SENTIMENT_WORKERS:
+        # Never fork the threaded server process
+        assert app.sentiment_pool._mp_context.get_start_method() != 'fork'
+    # Second pass is served entirely from the memo
+    assert app.get_polarities(list(reversed(MESSAGES))) == list(reversed(expected))
+
+
+def test_memoized_sentiment_matches_per_message_analysis(scoring):
+    expected = per_message_sentiment(MESSAGES)
+    assert app.analyze_commit_sentiment(MESSAGES) == expected
+    assert app.analyze_commit_sentiment(MESSAGES) == expected
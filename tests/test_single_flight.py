@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import SingleFlight
+
+
+def start_leader(flight, key, release, result=None, error=None):
+    """Run a leader call that blocks until `release` is set; returns (started, future)"""
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(flight.do, key, fn)
+    pool.shutdown(wait=False)
+    assert started.wait(5)
+    return future
+
+
+def submit_waiters(pool, flight, key, fn, count):
+    """Start `count` callers and give them time to block on the in-flight call"""
+    arrived = threading.Semaphore(0)
+
+    def call():
+        arrived.release()
+        return flight.do(key, fn, 5)
+
+    waiters = [pool.submit(call) for _ in range(count)]
+    for _ in range(count):
+        assert arrived.acquire(timeout=5)
+    time.sleep(0.05)
+    return waiters
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start_leader(flight, 'alice', release, result={'recap': 1})
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        waiters = submit_waiters(pool, flight, 'alice', lambda: calls.append(1), 4)
+        release.set()
+        results = [waiter.result(5) for waiter in waiters]
+
+    assert leader.result(5) == {'recap': 1}
+    assert results == [{'recap': 1}] * 4
+    assert calls == []
+
+
+def test_error_is_raised_to_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError('GitHub exploded')
+    leader = start_leader(flight, 'alice', release, error=error)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        waiters = submit_waiters(pool, flight, 'alice', lambda: 'unused', 3)
+        release.set()
+        for waiter in waiters:
+            with pytest.raises(ValueError, match='GitHub exploded'):
+                waiter.result(5)
+    with pytest.raises(ValueError):
+        leader.result(5)
+
+
+def test_waiter_times_out_without_cancelling_the_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start_leader(flight, 'alice', release, result='done')
+
+    with pytest.raises(TimeoutError):
+        flight.do('alice', lambda: 'unused', timeout=0.05)
+
+    release.set()
+    assert leader.result(5) == 'done'
+
+
+def test_key_is_removed_after_completion():
+    flight = SingleFlight()
+    assert flight.do('alice', lambda: 1) == 1
+    assert flight.calls == {}
+    # A later call runs again instead of reusing the old result
+    assert flight.do('alice', lambda: 2) == 2
+
+    with pytest.raises(RuntimeError):
+        flight.do('alice', lambda: (_ for _ in ()).throw(RuntimeError('boom')))
+    assert flight.calls == {}
+    assert flight.do('alice', lambda: 3) == 3
+
+
+def test_different_keys_do_not_wait_on_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start_leader(flight, 'alice', release, result='alice')
+    assert flight.do('bob', lambda: 'bob', timeout=1) == 'bob'
+    release.set()
+    assert leader.result(5) == 'alice'
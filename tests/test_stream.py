@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from app import MemoryStore, ResultCache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app.limiter, 'enabled', False)
+    return app.app.test_client()
+
+
+@pytest.fixture
+def slow_recap(monkeypatch):
+    """Replace the analysis with one that blocks until released and counts its runs"""
+    release = threading.Event()
+    started = threading.Event()
+    runs = []
+
+    def iter_recap(username, user_token=None, window=None):
+        runs.append(username)
+        yield 'profile', {'profile': {'username': username}}
+        started.set()
+        release.wait(5)
+        yield 'activity', {'stats': {'activity': {'total_active_days': 3}}}
+
+    def build_recap(username, user_token=None, window=None):
+        recap = {}
+        for _, fragment in iter_recap(username, user_token):
+            app.merge_recap_section(recap, fragment)
+        return recap
+
+    monkeypatch.setattr(app, 'iter_recap', iter_recap)
+    monkeypatch.setattr(app, 'result_cache', ResultCache(build_recap, MemoryStore(), flight_timeout=5))
+    return release, started, runs
+
+
+def events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def stream(client, username):
+    # The test client only runs the generator as the body is read
+    return events(client.get(f'/analyze/{username}/stream'))
+
+
+def test_concurrent_streams_share_one_analysis(client, slow_recap):
+    release, started, runs = slow_recap
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(stream, client, 'alice')
+        assert started.wait(5)
+        followers = [pool.submit(stream, client, 'alice') for _ in range(2)]
+        plain = pool.submit(client.get, '/analyze/alice')
+        time.sleep(0.1)
+        release.set()
+
+        leader_events = leader.result(5)
+        assert [event['section'] for event in leader_events] == ['profile', 'activity', 'done']
+        for follower in followers:
+            follower_events = follower.result(5)
+            assert [event['section'] for event in follower_events] == ['recap', 'done']
+            assert follower_events[0]['data']['stats']['activity']['total_active_days'] == 3
+        assert plain.result(5).get_json()['profile']['username'] == 'alice'
+
+    assert runs == ['alice']
+
+
+def test_stream_after_completion_is_served_from_cache(client, slow_recap):
+    release, _, runs = slow_recap
+    release.set()
+    stream(client, 'alice')
+    assert [event['section'] for event in stream(client, 'alice')] == ['recap', 'done']
+    assert runs == ['alice']
+    assert app.result_cache.flight.calls == {}
+
+
+def test_head_request_does_not_leave_the_flight_claimed(client, slow_recap):
+    release, _, runs = slow_recap
+    release.set()
+    head = client.head('/analyze/alice/stream')
+    # A server closes the response after sending it; the test client leaves that to the caller
+    head.close()
+    assert head.status_code == 200
+    assert app.result_cache.flight.calls == {}
+
+    response = client.get('/analyze/alice')
+    assert response.status_code == 200
+    assert response.get_json()['stats']['activity']['total_active_days'] == 3
+    assert runs == ['alice', 'alice']